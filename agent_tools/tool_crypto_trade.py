@@ -1,4 +1,3 @@
-import json
 import os
 import sys
 from typing import Any, Dict
@@ -12,7 +11,7 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
 from tools.crypto_tools import get_crypto_price_on_date
-from tools.general_tools import get_config_value, write_config_value
+from tools.general_tools import append_jsonl, get_config_value, write_config_value
 from tools.price_tools import get_latest_position
 
 mcp = FastMCP("CryptoTradeTools")
@@ -95,33 +94,29 @@ def buy_crypto(crypto_symbol: str, amount: float) -> Dict[str, Any]:
         }
     else:
         # Step 5: Execute buy operation, update position
-        new_position = current_position.copy()
-        new_position["CASH"] = cash_left
-        new_position[crypto_symbol] = new_position.get(crypto_symbol, 0) + amount
+        current_position["CASH"] = cash_left
+        current_position[crypto_symbol] = current_position.get(crypto_symbol, 0) + amount
 
         # Step 6: Record transaction to position.jsonl file
         position_file_path = os.path.join(
             project_root, "data", "agent_data", signature, "position", "position.jsonl"
         )
-        with open(position_file_path, "a") as f:
-            f.write(
-                json.dumps(
-                    {
-                        "date": today_date,
-                        "id": current_action_id + 1,
-                        "this_action": {
-                            "action": "buy_crypto",
-                            "symbol": crypto_symbol,
-                            "amount": amount,
-                        },
-                        "positions": new_position,
-                    }
-                )
-                + "\n"
-            )
+        append_jsonl(
+            position_file_path,
+            {
+                "date": today_date,
+                "id": current_action_id + 1,
+                "this_action": {
+                    "action": "buy_crypto",
+                    "symbol": crypto_symbol,
+                    "amount": amount,
+                },
+                "positions": current_position,
+            },
+        )
         # Step 7: Return updated position
         write_config_value("IF_TRADE", True)
-        return new_position
+        return current_position
 
 
 @mcp.tool()
@@ -197,34 +192,30 @@ def sell_crypto(crypto_symbol: str, amount: float) -> Dict[str, Any]:
         }
 
     # Step 5: Execute sell operation, update position
-    new_position = current_position.copy()
-    new_position[crypto_symbol] -= amount
-    new_position["CASH"] = new_position.get("CASH", 0) + this_symbol_price * amount
+    current_position[crypto_symbol] -= amount
+    current_position["CASH"] = current_position.get("CASH", 0) + this_symbol_price * amount
 
     # Step 6: Record transaction to position.jsonl file
     position_file_path = os.path.join(
         project_root, "data", "agent_data", signature, "position", "position.jsonl"
     )
-    with open(position_file_path, "a") as f:
-        f.write(
-            json.dumps(
-                {
-                    "date": today_date,
-                    "id": current_action_id + 1,
-                    "this_action": {
-                        "action": "sell_crypto",
-                        "symbol": crypto_symbol,
-                        "amount": amount,
-                    },
-                    "positions": new_position,
-                }
-            )
-            + "\n"
-        )
+    append_jsonl(
+        position_file_path,
+        {
+            "date": today_date,
+            "id": current_action_id + 1,
+            "this_action": {
+                "action": "sell_crypto",
+                "symbol": crypto_symbol,
+                "amount": amount,
+            },
+            "positions": current_position,
+        },
+    )
 
     # Step 7: Return updated position
     write_config_value("IF_TRADE", True)
-    return new_position
+    return current_position
 
 
 if __name__ == "__main__":
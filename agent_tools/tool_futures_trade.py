@@ -1,7 +1,6 @@
-import json
 import os
 import sys
-from typing import Any, Dict
+from typing import Any, Dict, FrozenSet
 
 from fastmcp import FastMCP
 from starlette.requests import Request
@@ -11,12 +10,29 @@ from starlette.responses import PlainTextResponse
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
-from tools.futures_tools import get_futures_price_on_date, load_futures_intraday_data
-from tools.general_tools import get_config_value
+from tools.futures_tools import get_futures_candles_on_date, get_futures_price_on_date
+from tools.general_tools import append_jsonl, get_config_value
 from tools.price_tools import get_latest_position
 
 mcp = FastMCP("FuturesTradeTools")
 
+# Dollar value of a one-point move, per contract
+CONTRACT_MULTIPLIERS: Dict[str, int] = {
+    "NQ1": 20,
+    "ES": 50,
+    "MES": 5,
+    "MNQ": 2,
+    "YM": 5,
+    "GC": 100,
+    "CL": 1000,
+    "ZB": 1000,
+    "ZS": 50,
+    "ZC": 50,
+    "ZW": 50,
+}
+SUPPORTED_FUTURES: FrozenSet[str] = frozenset(CONTRACT_MULTIPLIERS)
+SUPPORTED_FUTURES_STR = ", ".join(CONTRACT_MULTIPLIERS)
+
 
 @mcp.custom_route("/health", methods=["GET"])
 async def health_check(request: Request) -> PlainTextResponse:
@@ -27,31 +43,34 @@ async def health_check(request: Request) -> PlainTextResponse:
     return PlainTextResponse("OK")
 
 
+_format_grid_row = "{:<25} ${:>14,.2f} ${:>14,.2f} ${:>14,.2f} ${:>14,.2f}".format
+
+
 def get_futures_data_grid(futures_symbol: str, target_date: str) -> str:
     """
     Get formatted data grid showing all OHLC data for the day
     """
-    data = load_futures_intraday_data(futures_symbol)
-
-    day_data = {}
-    for dt_str, ohlc in sorted(data.items()):
-        if dt_str.startswith(target_date):
-            day_data[dt_str] = ohlc
+    day_data = get_futures_candles_on_date(futures_symbol, target_date)
 
     if not day_data:
         return f"No data available for {futures_symbol} on {target_date}"
 
-    grid = f"\n{'='*110}\n"
-    grid += f"📊 DATA GRID: {futures_symbol} on {target_date} ({len(day_data)} candles)\n"
-    grid += f"{ '='*110}\n"
-    grid += f"{ 'TIMESTAMP':<25} {'OPEN':>15} {'HIGH':>15} {'LOW':>15} {'CLOSE':>15}\n"
-    grid += f"{ '-'*85}\n"
-
-    for dt_str, ohlc in day_data.items():
-        grid += f"{dt_str:<25} ${ohlc['open']:>14,.2f} ${ohlc['high']:>14,.2f} ${ohlc['low']:>14,.2f} ${ohlc['close']:>14,.2f}\n"
-
-    grid += f"{ '='*110}\n"
-    return grid
+    rule = "=" * 110
+    parts = [
+        "",
+        rule,
+        f"📊 DATA GRID: {futures_symbol} on {target_date} ({len(day_data)} candles)",
+        rule,
+        f"{'TIMESTAMP':<25} {'OPEN':>15} {'HIGH':>15} {'LOW':>15} {'CLOSE':>15}",
+        "-" * 85,
+    ]
+    parts.extend(
+        _format_grid_row(dt_str, ohlc["open"], ohlc["high"], ohlc["low"], ohlc["close"])
+        for dt_str, ohlc in day_data
+    )
+    parts.append(rule)
+    parts.append("")
+    return "\n".join(parts)
 
 
 @mcp.tool()
@@ -65,10 +84,16 @@ def buy_futures(futures_symbol: str, contracts: float) -> Dict[str, Any]:
 
     today_date = get_config_value("TODAY_DATE")
 
-    SUPPORTED_FUTURES = ["NQ1", "ES", "MES", "MNQ", "YM", "GC", "CL", "ZB", "ZS", "ZC", "ZW"]
     if futures_symbol not in SUPPORTED_FUTURES:
         return {
-            "error": f"Unsupported futures contract: {futures_symbol}. Supported: {', '.join(SUPPORTED_FUTURES)}",
+            "error": f"Unsupported futures contract: {futures_symbol}. Supported: {SUPPORTED_FUTURES_STR}",
+            "symbol": futures_symbol,
+            "date": today_date,
+        }
+
+    if contracts <= 0:
+        return {
+            "error": f"Contracts must be positive, got {contracts}. This action will not be allowed.",
             "symbol": futures_symbol,
             "date": today_date,
         }
@@ -94,7 +119,7 @@ def buy_futures(futures_symbol: str, contracts: float) -> Dict[str, Any]:
             "data_grid": data_grid,
         }
 
-    contract_multiplier = 20
+    contract_multiplier = CONTRACT_MULTIPLIERS[futures_symbol]
     cost_per_contract = price * contract_multiplier
     total_cost = cost_per_contract * contracts
     cash_left = current_position["CASH"] - total_cost
@@ -112,12 +137,10 @@ def buy_futures(futures_symbol: str, contracts: float) -> Dict[str, Any]:
             "data_grid": data_grid,
         }
 
-    new_position = current_position.copy()
-    new_position[futures_symbol] = new_position.get(futures_symbol, 0) + contracts
-    new_position["CASH"] = cash_left
+    current_position[futures_symbol] = current_position.get(futures_symbol, 0) + contracts
+    current_position["CASH"] = cash_left
 
     position_file = f"data/agent_data/{signature}/position/position.jsonl"
-    os.makedirs(os.path.dirname(position_file), exist_ok=True)
 
     transaction_record = {
         "date": today_date,
@@ -127,11 +150,10 @@ def buy_futures(futures_symbol: str, contracts: float) -> Dict[str, Any]:
         "contracts": contracts,
         "price": price,
         "total_cost": total_cost,
-        "positions": new_position,
+        "positions": current_position,
     }
 
-    with open(position_file, "a") as f:
-        f.write(json.dumps(transaction_record) + "\n")
+    append_jsonl(position_file, transaction_record)
 
     return {
         "success": True,
@@ -142,7 +164,7 @@ def buy_futures(futures_symbol: str, contracts: float) -> Dict[str, Any]:
         "cost_per_contract": cost_per_contract,
         "total_cost": total_cost,
         "new_cash": cash_left,
-        "positions": new_position,
+        "positions": current_position,
         "date": today_date,
         "data_grid": data_grid,
     }
@@ -159,7 +181,6 @@ def sell_futures(futures_symbol: str, contracts: float) -> Dict[str, Any]:
 
     today_date = get_config_value("TODAY_DATE")
 
-    SUPPORTED_FUTURES = ["NQ1", "ES", "MES", "MNQ", "YM", "GC", "CL", "ZB", "ZS", "ZC", "ZW"]
     if futures_symbol not in SUPPORTED_FUTURES:
         return {
             "error": f"Unsupported futures contract: {futures_symbol}",
@@ -167,6 +188,13 @@ def sell_futures(futures_symbol: str, contracts: float) -> Dict[str, Any]:
             "date": today_date,
         }
 
+    if contracts <= 0:
+        return {
+            "error": f"Contracts must be positive, got {contracts}. This action will not be allowed.",
+            "symbol": futures_symbol,
+            "date": today_date,
+        }
+
     current_position, current_action_id = get_latest_position(today_date, signature)
 
     try:
@@ -200,15 +228,13 @@ def sell_futures(futures_symbol: str, contracts: float) -> Dict[str, Any]:
             "data_grid": data_grid,
         }
 
-    contract_multiplier = 20
+    contract_multiplier = CONTRACT_MULTIPLIERS[futures_symbol]
     proceeds = price * contract_multiplier * contracts
 
-    new_position = current_position.copy()
-    new_position[futures_symbol] = current_contracts - contracts
-    new_position["CASH"] = new_position["CASH"] + proceeds
+    current_position[futures_symbol] = current_contracts - contracts
+    current_position["CASH"] = current_position["CASH"] + proceeds
 
     position_file = f"data/agent_data/{signature}/position/position.jsonl"
-    os.makedirs(os.path.dirname(position_file), exist_ok=True)
 
     transaction_record = {
         "date": today_date,
@@ -218,11 +244,10 @@ def sell_futures(futures_symbol: str, contracts: float) -> Dict[str, Any]:
         "contracts": contracts,
         "price": price,
         "proceeds": proceeds,
-        "positions": new_position,
+        "positions": current_position,
     }
 
-    with open(position_file, "a") as f:
-        f.write(json.dumps(transaction_record) + "\n")
+    append_jsonl(position_file, transaction_record)
 
     return {
         "success": True,
@@ -232,8 +257,8 @@ def sell_futures(futures_symbol: str, contracts: float) -> Dict[str, Any]:
         "price_per_point": price,
         "proceeds_per_contract": price * contract_multiplier,
         "total_proceeds": proceeds,
-        "new_cash": new_position["CASH"],
-        "positions": new_position,
+        "new_cash": current_position["CASH"],
+        "positions": current_position,
         "date": today_date,
         "data_grid": data_grid,
     }
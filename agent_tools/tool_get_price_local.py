@@ -1,10 +1,12 @@
-import json
+import functools
+import heapq
 import os
 import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
+import orjson
 from dotenv import load_dotenv
 from fastmcp import FastMCP
 from starlette.requests import Request
@@ -15,6 +17,7 @@ load_dotenv()
 # Add project root to path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
+from tools.price_tools import MERGED_SYMBOL_PATTERN
 
 mcp = FastMCP("LocalPrices")
 
@@ -39,6 +42,33 @@ def _validate_date(date_str: str) -> None:
         raise ValueError("date must be in YYYY-MM-DD format") from exc
 
 
+@functools.lru_cache(maxsize=4)
+def _symbol_offsets(path: str, mtime_ns: int, size: int) -> Dict[str, int]:
+    """Byte offset of the first line for each symbol, built once per file version."""
+    offsets: Dict[str, int] = {}
+    with open(path, "rb") as f:
+        offset = 0
+        for line in f:
+            match = MERGED_SYMBOL_PATTERN.search(line)
+            if match:
+                offsets.setdefault(orjson.loads(match.group(1)), offset)
+            offset += len(line)
+    return offsets
+
+
+@functools.lru_cache(maxsize=64)
+def _load_symbol_doc(
+    path: str, mtime_ns: int, size: int, symbol: str
+) -> Optional[Dict[str, Any]]:
+    """Parse only the line holding symbol; callers must treat the result as read-only."""
+    offset = _symbol_offsets(path, mtime_ns, size).get(symbol)
+    if offset is None:
+        return None
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return orjson.loads(f.readline())
+
+
 @mcp.tool()
 def get_price_local(symbol: str, date: str) -> Dict[str, Any]:
     """
@@ -68,35 +98,30 @@ def get_price_local(symbol: str, date: str) -> Dict[str, Any]:
             "status": "data_loading",
         }
 
-    with data_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            doc = json.loads(line)
-            meta = doc.get("Meta Data", {})
-            if meta.get("2. Symbol") != symbol:
-                continue
-            series = doc.get("Time Series (Daily)", {})
-            day = series.get(date)
-            if day is None:
-                sample_dates = sorted(series.keys(), reverse=True)[:5]
-                return {
-                    "error": f"Data not found for date {date}. "
-                             f"Sample available dates: {sample_dates}",
-                    "symbol": symbol,
-                    "date": date,
-                }
+    stat = data_path.stat()
+    doc = _load_symbol_doc(str(data_path), stat.st_mtime_ns, stat.st_size, symbol)
+    if doc is not None:
+        series = doc.get("Time Series (Daily)", {})
+        day = series.get(date)
+        if day is None:
+            sample_dates = heapq.nlargest(5, series.keys())
             return {
+                "error": f"Data not found for date {date}. "
+                         f"Sample available dates: {sample_dates}",
                 "symbol": symbol,
                 "date": date,
-                "ohlcv": {
-                    "open": day.get("1. buy price"),
-                    "high": day.get("2. high"),
-                    "low": day.get("3. low"),
-                    "close": day.get("4. sell price"),
-                    "volume": day.get("5. volume"),
-                },
             }
+        return {
+            "symbol": symbol,
+            "date": date,
+            "ohlcv": {
+                "open": day.get("1. buy price"),
+                "high": day.get("2. high"),
+                "low": day.get("3. low"),
+                "close": day.get("4. sell price"),
+                "volume": day.get("5. volume"),
+            },
+        }
 
     return {
         "error": f"No records found for stock {symbol} in local data",
@@ -1,12 +1,13 @@
+import asyncio
 import logging
 import os
 import random
 import re
 import sys
 from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-import requests
+import httpx
 from dotenv import load_dotenv
 from fastmcp import FastMCP
 from starlette.requests import Request
@@ -14,11 +15,56 @@ from starlette.responses import PlainTextResponse
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from tools.general_tools import get_config_value
+from tools.general_tools import get_config_value, trunc
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# The reader gets extra read time on top of its own X-Timeout
+_SEARCH_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
+_SCRAPE_TIMEOUT = httpx.Timeout(15.0, connect=3.0)
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_MAX_RETRIES = 2
+
+# One keep-alive pool per server process, so repeated calls skip TCP/TLS setup
+_CLIENT = httpx.AsyncClient(
+    headers={"Accept": "application/json"},
+    limits=httpx.Limits(max_connections=16, max_keepalive_connections=8),
+    transport=httpx.AsyncHTTPTransport(retries=_MAX_RETRIES),
+)
+
+
+async def _get(
+    url: str,
+    headers: Dict[str, str],
+    timeout: httpx.Timeout,
+    params: Optional[Dict[str, Any]] = None,
+) -> httpx.Response:
+    """GET through the shared client, retrying throttling and 5xx responses.
+
+    Connection errors are retried by the transport and raise httpx.HTTPError
+    once exhausted. The last attempt's response is returned whatever its
+    status, for the caller to check.
+    """
+    request = {"params": params, "headers": headers, "timeout": timeout}
+    for attempt in range(_MAX_RETRIES):
+        response = await _CLIENT.get(url, **request)
+        if response.status_code not in _RETRY_STATUSES:
+            return response
+        await asyncio.sleep(0.3 * 2**attempt)
+    return await _CLIENT.get(url, **request)
+
+
+_DIGITS_RE = re.compile(r"\d+")
+_ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}$")
+# Units for "N <unit> ago" dates, tried in order
+_RELATIVE_UNITS = (
+    ("hour", lambda n: timedelta(hours=n)),
+    ("day", lambda n: timedelta(days=n)),
+    ("week", lambda n: timedelta(weeks=n)),
+    ("month", lambda n: timedelta(days=n * 30)),
+)
+
 
 def parse_date_to_standard(date_str: str) -> str:  # noqa: C901
     """
@@ -27,21 +73,14 @@ def parse_date_to_standard(date_str: str) -> str:  # noqa: C901
     if not date_str or date_str == "unknown":
         return "unknown"
 
-    if "ago" in date_str.lower():
+    lowered = date_str.lower()
+    if "ago" in lowered:
         try:
-            now = datetime.now()
-            if "hour" in date_str.lower():
-                hours = int(re.findall(r"\d+", date_str)[0])
-                target_date = now - timedelta(hours=hours)
-            elif "day" in date_str.lower():
-                days = int(re.findall(r"\d+", date_str)[0])
-                target_date = now - timedelta(days=days)
-            elif "week" in date_str.lower():
-                weeks = int(re.findall(r"\d+", date_str)[0])
-                target_date = now - timedelta(weeks=weeks)
-            elif "month" in date_str.lower():
-                months = int(re.findall(r"\d+", date_str)[0])
-                target_date = now - timedelta(days=months * 30)
+            for unit, to_delta in _RELATIVE_UNITS:
+                if unit in lowered:
+                    amount = int(_DIGITS_RE.search(date_str).group())
+                    target_date = datetime.now() - to_delta(amount)
+                    break
             else:
                 return "unknown"
             return target_date.strftime("%Y-%m-%d %H:%M:%S")
@@ -73,7 +112,7 @@ def parse_date_to_standard(date_str: str) -> str:  # noqa: C901
         pass
 
     try:
-        if re.match(r"\d{4}-\d{2}-\d{2}$", date_str):
+        if _ISO_DATE_RE.match(date_str):
             parsed_date = datetime.strptime(date_str, "%Y-%m-%d")
             return parsed_date.strftime("%Y-%m-%d %H:%M:%S")
     except Exception:
@@ -88,29 +127,30 @@ class WebScrapingJinaTool:
         if not self.api_key:
             raise ValueError("Jina API key not provided! Please set JINA_API_KEY environment variable.")
 
-    def __call__(self, query: str) -> List[Dict[str, Any]]:
+    async def __call__(self, query: str) -> List[Dict[str, Any]]:
         print(f"Searching for {query}")
-        all_urls = self._jina_search(query)
-        return_content = []
+        all_urls = await self._jina_search(query)
         print(f"Found {len(all_urls)} URLs")
         if len(all_urls) > 1:
             all_urls = random.sample(all_urls, 1)
-        for url in all_urls:
-            print(f"Scraping {url}")
-            return_content.append(self._jina_scrape(url))
-            print(f"Scraped {url}")
+        if not all_urls:
+            return []
+        print(f"Scraping {len(all_urls)} URLs: {', '.join(all_urls)}")
+        # gather keeps results in URL order
+        scrapes = (self._jina_scrape(url) for url in all_urls)
+        return_content = list(await asyncio.gather(*scrapes))
+        print(f"Scraped {len(return_content)} URLs")
         return return_content
 
-    def _jina_scrape(self, url: str) -> Dict[str, Any]:
+    async def _jina_scrape(self, url: str) -> Dict[str, Any]:
         try:
             jina_url = f"https://r.jina.ai/{url}"
             headers = {
-                "Accept": "application/json",
                 "Authorization": self.api_key,
                 "X-Timeout": "10",
                 "X-With-Generated-Alt": "true",
             }
-            response = requests.get(jina_url, headers=headers)
+            response = await _get(jina_url, headers, _SCRAPE_TIMEOUT)
             if response.status_code != 200:
                 raise Exception(f"Jina AI Reader Failed for {url}: {response.status_code}")
             response_dict = response.json()
@@ -125,15 +165,18 @@ class WebScrapingJinaTool:
             logger.error(str(e))
             return {"url": url, "content": "", "error": str(e)}
 
-    def _jina_search(self, query: str) -> List[str]:  # noqa: C901
-        url = f"https://s.jina.ai/?q={query}&n=1"
+    async def _jina_search(self, query: str) -> List[str]:  # noqa: C901
         headers = {
             "Authorization": f"Bearer {self.api_key}",
-            "Accept": "application/json",
             "X-Respond-With": "no-content",
         }
         try:
-            response = requests.get(url, headers=headers)
+            response = await _get(
+                "https://s.jina.ai/",
+                headers,
+                _SEARCH_TIMEOUT,
+                params={"q": query, "n": 1},
+            )
             response.raise_for_status()
             json_data = response.json()
             if json_data is None:
@@ -159,7 +202,7 @@ class WebScrapingJinaTool:
                     filtered_urls.append(item["url"])
             print(f"Found {len(filtered_urls)} URLs after filtering")
             return filtered_urls
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"❌ Jina API request failed: {e}")
             return []
         except ValueError as e:
@@ -179,13 +222,13 @@ async def health_check(request: Request) -> PlainTextResponse:
 
 
 @mcp.tool()
-def get_information(query: str) -> str:
+async def get_information(query: str) -> str:
     """
     Use search tool to scrape and return main content information related to specified query in a structured way.
     """
     try:
         tool = WebScrapingJinaTool()
-        results = tool(query)
+        results = await tool(query)
         if not results:
             return f"⚠️ Search query '{query}' found no results. May be network issue or API limitation."
         formatted_results = []
@@ -199,7 +242,7 @@ URL: {result['url']}
 Title: {result['title']}
 Description: {result['description']}
 Publish Time: {result['publish_time']}
-Content: {result['content'][:1000]}...\n"""
+Content: {trunc(result['content'], 1000)}\n"""
                 )
         if not formatted_results:
             return f"⚠️ Search query '{query}' returned empty results."
@@ -1,4 +1,3 @@
-import json
 import os
 import sys
 from typing import Any, Dict
@@ -11,7 +10,7 @@ from starlette.responses import PlainTextResponse
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
-from tools.general_tools import get_config_value, write_config_value
+from tools.general_tools import append_jsonl, get_config_value, write_config_value
 from tools.price_tools import get_latest_position, get_open_prices
 
 mcp = FastMCP("TradeTools")
@@ -67,24 +66,24 @@ def buy_logic(symbol: str, amount: int) -> Dict[str, Any]:
             "date": today_date,
         }
     else:
-        new_position = current_position.copy()
-        new_position["CASH"] = cash_left
-        new_position[symbol] = new_position.get(symbol, 0) + amount
+        current_position["CASH"] = cash_left
+        current_position[symbol] = current_position.get(symbol, 0) + amount
 
         position_file_path = os.path.join(
             project_root, "data", "agent_data", signature, "position", "position.jsonl"
         )
-        with open(position_file_path, "a") as f:
-            log_data = {
+        append_jsonl(
+            position_file_path,
+            {
                 "date": today_date,
                 "id": current_action_id + 1,
                 "this_action": {"action": "buy", "symbol": symbol, "amount": amount},
-                "positions": new_position,
-            }
-            f.write(json.dumps(log_data) + "\n")
+                "positions": current_position,
+            },
+        )
 
         write_config_value("IF_TRADE", True)
-        return new_position
+        return current_position
 
 def sell_logic(symbol: str, amount: int) -> Dict[str, Any]:
     """
@@ -126,24 +125,24 @@ def sell_logic(symbol: str, amount: int) -> Dict[str, Any]:
             "date": today_date,
         }
 
-    new_position = current_position.copy()
-    new_position[symbol] -= amount
-    new_position["CASH"] = new_position.get("CASH", 0) + this_symbol_price * amount
+    current_position[symbol] -= amount
+    current_position["CASH"] = current_position.get("CASH", 0) + this_symbol_price * amount
 
     position_file_path = os.path.join(
         project_root, "data", "agent_data", signature, "position", "position.jsonl"
     )
-    with open(position_file_path, "a") as f:
-        log_data = {
+    append_jsonl(
+        position_file_path,
+        {
             "date": today_date,
             "id": current_action_id + 1,
             "this_action": {"action": "sell", "symbol": symbol, "amount": amount},
-            "positions": new_position,
-        }
-        f.write(json.dumps(log_data) + "\n")
+            "positions": current_position,
+        },
+    )
 
     write_config_value("IF_TRADE", True)
-    return new_position
+    return current_position
 
 
 @mcp.tool()
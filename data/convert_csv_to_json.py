@@ -4,12 +4,17 @@ Convert TradingView CSV data to multiple JSON timeframes using Polars.
 Creates both a daily and a 60-minute intraday JSON file from a single CSV.
 """
 
-import json
+import multiprocessing as mp
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import orjson
 import polars as pl
 
+# Symbols written as future_prices_*; everything else is written as daily_prices_*
+_FUTURES_SYMBOLS = frozenset({"NQ1", "ES"})
+
 
 def convert_csv_to_json(csv_file, output_dir="data"):
     """
@@ -30,76 +35,61 @@ def convert_csv_to_json(csv_file, output_dir="data"):
 
     print(f"Processing {csv_file} for symbol {symbol}...")
 
-    # Read CSV and convert UNIX timestamp to datetime
-    df = pl.read_csv(csv_file).with_columns(
+    # Scan CSV lazily and convert UNIX timestamp to datetime
+    lf = pl.scan_csv(csv_file).with_columns(
         pl.from_epoch(pl.col("time"), time_unit="s").alias("datetime")
     )
 
-    # --- 2. Resample to Daily Data ---
-    df_daily = (
-        df.group_by_dynamic("datetime", every="1d", period="1d", closed="left")
-        .agg(
-            pl.col("open").first().alias("open"),
-            pl.col("high").max().alias("high"),
-            pl.col("low").min().alias("low"),
-            pl.col("close").last().alias("close"),
-            pl.col("volume").sum().alias("volume"),
+    # --- 2. Resample to Daily and 60-Minute Data ---
+    def resample(every: str) -> pl.LazyFrame:
+        # Midnight candles are keyed by date only, everything else by full timestamp
+        ts = pl.col("datetime")
+        return (
+            lf.group_by_dynamic("datetime", every=every, period=every, closed="left")
+            .agg(
+                pl.col("open").first().alias("open"),
+                pl.col("high").max().alias("high"),
+                pl.col("low").min().alias("low"),
+                pl.col("close").last().alias("close"),
+                pl.col("volume").sum().alias("volume"),
+            )
+            .sort("datetime")
+            .select(
+                pl.when(ts.dt.hour() == 0)
+                .then(ts.dt.strftime("%Y-%m-%d"))
+                .otherwise(ts.dt.strftime("%Y-%m-%d %H:%M:%S"))
+                .alias("date"),
+                "open",
+                "high",
+                "low",
+                "close",
+                "volume",
+            )
         )
-        .sort("datetime")
-    )
 
-    # --- 3. Resample to 60-Minute Data ---
-    df_hourly = (
-        df.group_by_dynamic("datetime", every="60m", period="60m", closed="left")
-        .agg(
-            pl.col("open").first().alias("open"),
-            pl.col("high").max().alias("high"),
-            pl.col("low").min().alias("low"),
-            pl.col("close").last().alias("close"),
-            pl.col("volume").sum().alias("volume"),
-        )
-        .sort("datetime")
-    )
+    # Both plans share one CSV scan and run in parallel
+    df_daily, df_hourly = pl.collect_all([resample("1d"), resample("60m")])
 
-    # --- 4. Convert to Dictionary and Save ---
-    def to_ohlc_dict(dataframe: pl.DataFrame, time_col: str) -> dict:
-        ohlc_dict = {}
-        for row in dataframe.to_dicts():
-            # Format timestamp as string key
-            ts_key = row[time_col].strftime(
-                "%Y-%m-%d"
-                if time_col == "datetime" and row[time_col].hour == 0
-                else "%Y-%m-%d %H:%M:%S"
-            )
-            ohlc_dict[ts_key] = {
-                "date": ts_key,
-                "open": row["open"],
-                "high": row["high"],
-                "low": row["low"],
-                "close": row["close"],
-                "volume": row["volume"],
-            }
-        return ohlc_dict
-
-    daily_dict = to_ohlc_dict(df_daily, "datetime")
-    hourly_dict = to_ohlc_dict(df_hourly, "datetime")
-
-    # --- 5. Save Files ---
+    # --- 3. Convert to Dictionary and Save ---
+    daily_dict = {row["date"]: row for row in df_daily.to_dicts()}
+    hourly_dict = {row["date"]: row for row in df_hourly.to_dicts()}
+
+    # --- 4. Save Files ---
     os.makedirs(output_dir, exist_ok=True)
     asset_prefix = (
-        "future_prices" if symbol.upper() in ["NQ1", "ES"] else "daily_prices"
+        "future_prices" if symbol.upper() in _FUTURES_SYMBOLS else "daily_prices"
     )
 
     # Save daily file
     daily_filename = f"{output_dir}/{asset_prefix}_{symbol}_daily.json"
-    with open(daily_filename, "w") as f:
-        json.dump(daily_dict, f, indent=2)
+    with open(daily_filename, "wb") as f:
+        f.write(orjson.dumps(daily_dict, option=orjson.OPT_INDENT_2))
     print(f"✓ Saved DAILY data to {daily_filename} ({len(daily_dict)} records)")
 
     # Save intraday file
     intraday_filename = f"{output_dir}/{asset_prefix}_{symbol}.json"
-    with open(intraday_filename, "w") as f:
-        json.dump(hourly_dict, f, indent=2)
+    with open(intraday_filename, "wb") as f:
+        f.write(orjson.dumps(hourly_dict, option=orjson.OPT_INDENT_2))
     print(f"✓ Saved 60-MINUTE data to {intraday_filename} ({len(hourly_dict)} records)")
 
     return daily_filename, intraday_filename
@@ -122,13 +112,22 @@ def convert_all_csv_files(csv_dir="tv_data", output_dir="data"):
     print(f"Found {len(csv_files)} CSV files in {csv_dir}\n")
 
     converted_files = []
-    for csv_file in csv_files:
-        try:
-            daily_file, intraday_file = convert_csv_to_json(str(csv_file), output_dir)
-            converted_files.extend([daily_file, intraday_file])
-            print()
-        except Exception as e:
-            print(f"✗ Error converting {csv_file}: {e}\n")
+    # Files are independent; spawn (not fork) gives each worker a clean Polars pool
+    workers = min(len(csv_files), os.cpu_count() or 1)
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=mp.get_context("spawn")
+    ) as executor:
+        futures = [
+            (csv_file, executor.submit(convert_csv_to_json, str(csv_file), output_dir))
+            for csv_file in csv_files
+        ]
+        for csv_file, future in futures:
+            try:
+                daily_file, intraday_file = future.result()
+                converted_files.extend([daily_file, intraday_file])
+                print()
+            except Exception as e:
+                print(f"✗ Error converting {csv_file}: {e}\n")
 
     print(
         f"{'='*60}\n✓ Conversion complete! {len(converted_files)} total files created.\n{'='*60}\n"
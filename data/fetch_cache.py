@@ -0,0 +1,42 @@
+"""
+On-disk TTL cache for API responses, keyed on (symbol, endpoint, days)
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+import orjson
+
+# Anchored to data/ so every working directory shares one cache
+CACHE_DIR = Path(__file__).resolve().parent / ".cache"
+
+# Daily candles only change once a day, intraday ones every few minutes
+DAILY_TTL = 4 * 60 * 60
+INTRADAY_TTL = 15 * 60
+
+
+def _cache_file(symbol: str, endpoint: str, days) -> Path:
+    return CACHE_DIR / f"{endpoint}_{symbol}_{days}.json"
+
+
+def read_cached(symbol: str, endpoint: str, days, ttl: float) -> Optional[dict]:
+    """
+    Return the cached payload if it is younger than `ttl` seconds, else None.
+    """
+    path = _cache_file(symbol, endpoint, days)
+    try:
+        if time.time() - path.stat().st_mtime >= ttl:
+            return None
+        return orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+
+def write_cached(symbol: str, endpoint: str, days, data: dict) -> None:
+    """
+    Store a payload for later read_cached calls.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    _cache_file(symbol, endpoint, days).write_bytes(orjson.dumps(data))
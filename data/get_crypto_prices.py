@@ -4,16 +4,25 @@ Fetch cryptocurrency price data from CoinGecko API
 Supports: Bitcoin (BTC) and Ethereum (ETH)
 """
 
-import json
 import os
-import time
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+import orjson
 import polars as pl
 import requests
 
+# Make the project root importable when run as a script from data/
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from data.fetch_cache import DAILY_TTL, INTRADAY_TTL, read_cached, write_cached
+from data.http_session import SESSION
+
 COINGECKO_API = "https://api.coingecko.com/api/v3"
 CRYPTO_MAP = {"BTC": "bitcoin", "ETH": "ethereum"}
+_MAX_CONCURRENT_SYMBOLS = 2
 
 
 def get_crypto_daily_data(symbol: str, days: int = 180) -> dict:
@@ -28,22 +37,22 @@ def get_crypto_daily_data(symbol: str, days: int = 180) -> dict:
         url = f"{COINGECKO_API}/coins/{crypto_id}/ohlc"
         params = {"vs_currency": "usd", "days": str(days)}
         print(f"Fetching {days}-day DAILY OHLC data for {symbol}...")
-        response = requests.get(url, params=params, timeout=20)
+        response = SESSION.get(url, params=params, timeout=20)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         if not data:
             return {}
 
-        ohlcv_data = {
-            datetime.fromtimestamp(p[0] / 1000).strftime("%Y-%m-%d"): {
-                "date": datetime.fromtimestamp(p[0] / 1000).strftime("%Y-%m-%d"),
-                "open": p[1], "high": p[2], "low": p[3], "close": p[4], "volume": 0,
+        ohlcv_data = {}
+        for p in data:
+            # Local-time date, formatted once per candle
+            day = datetime.fromtimestamp(p[0] / 1000).strftime("%Y-%m-%d")
+            ohlcv_data[day] = {
+                "date": day, "open": p[1], "high": p[2], "low": p[3], "close": p[4], "volume": 0,
             }
-            for p in data
-        }
         print(f"✓ Retrieved {len(ohlcv_data)} daily data points for {symbol}")
         return ohlcv_data
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         print(f"✗ Error fetching daily data for {symbol}: {e}")
         return {}
 
@@ -63,20 +72,17 @@ def get_crypto_intraday_data(symbol: str, from_date: datetime, to_date: datetime
         url = f"{COINGECKO_API}/coins/{crypto_id}/market_chart/range"
         params = {"vs_currency": "usd", "from": str(from_ts), "to": str(to_ts)}
         print(f"Fetching INTRADAY data for {symbol} from {from_date} to {to_date}...")
-        response = requests.get(url, params=params, timeout=20)
+        response = SESSION.get(url, params=params, timeout=20)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
 
         if not data.get("prices"):
             return {}
 
         # Use Polars to resample price data into hourly OHLC
-        df = pl.DataFrame(data["prices"], schema=["timestamp", "price"])
-        df = df.with_columns(
-            (pl.col("timestamp") / 1000).cast(pl.Int64).alias("timestamp_s"),
-        ).with_columns(
-            pl.from_epoch(pl.col("timestamp_s"), time_unit="s").alias("datetime")
-        )
+        df = pl.DataFrame(
+            data["prices"], schema={"timestamp": pl.Int64, "price": pl.Float64}, orient="row"
+        ).with_columns(pl.from_epoch(pl.col("timestamp"), time_unit="ms").alias("datetime"))
 
         df_ohlc = df.group_by_dynamic("datetime", every="1h").agg(
             pl.col("price").first().alias("open"),
@@ -85,16 +91,14 @@ def get_crypto_intraday_data(symbol: str, from_date: datetime, to_date: datetime
             pl.col("price").last().alias("close"),
         )
 
-        ohlcv_data = {
-            row["datetime"].strftime("%Y-%m-%d %H:%M:%S"): {
-                "date": row["datetime"].strftime("%Y-%m-%d %H:%M:%S"),
-                "open": row["open"], "high": row["high"], "low": row["low"], "close": row["close"], "volume": 0,
-            }
-            for row in df_ohlc.to_dicts()
-        }
+        rows = df_ohlc.select(
+            pl.col("datetime").dt.strftime("%Y-%m-%d %H:%M:%S").alias("date"),
+            "open", "high", "low", "close", pl.lit(0).alias("volume"),
+        ).to_dicts()
+        ohlcv_data = {row["date"]: row for row in rows}
         print(f"✓ Resampled into {len(ohlcv_data)} hourly data points for {symbol}")
         return ohlcv_data
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         print(f"✗ Error fetching intraday data for {symbol}: {e}")
         return {}
 
@@ -102,13 +106,17 @@ def get_crypto_intraday_data(symbol: str, from_date: datetime, to_date: datetime
 def save_crypto_data(symbol: str, data: dict, output_dir: str = "data", suffix: str = ""):
     os.makedirs(output_dir, exist_ok=True)
     filename = os.path.join(output_dir, f"crypto_prices_{symbol}{suffix}.json")
-    with open(filename, "w") as f:
-        json.dump(data, f, indent=2)
+    with open(filename, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
     print(f"✓ Saved {symbol} data to {filename}")
 
 
 def fetch_all_crypto_data(
-    symbols: list = None, intraday_days: int = 3, daily_days: int = 180, output_dir: str = "data"
+    symbols: list = None,
+    intraday_days: int = 3,
+    daily_days: int = 180,
+    output_dir: str = "data",
+    refresh: bool = False,
 ):
     if symbols is None:
         symbols = ["BTC", "ETH"]
@@ -121,17 +129,28 @@ def fetch_all_crypto_data(
     to_date = datetime.now()
     intraday_from_date = to_date - timedelta(days=intraday_days)
 
-    for symbol in symbols:
+    def fetch_symbol(symbol: str) -> None:
         try:
-            daily_data = get_crypto_daily_data(symbol, days=daily_days)
+            # Responses younger than their TTL are reused unless a refresh is forced
+            daily_data = None if refresh else read_cached(symbol, "ohlc", daily_days, DAILY_TTL)
+            if daily_data is None:
+                daily_data = get_crypto_daily_data(symbol, days=daily_days)
+                if daily_data:
+                    write_cached(symbol, "ohlc", daily_days, daily_data)
             if daily_data:
                 save_crypto_data(symbol, daily_data, output_dir, suffix="_daily")
             else:
                 print(f"⚠️  Failed to fetch daily data for {symbol}\n")
 
-            time.sleep(2)
-
-            intraday_data = get_crypto_intraday_data(symbol, from_date=intraday_from_date, to_date=to_date)
+            intraday_data = (
+                None if refresh else read_cached(symbol, "market_chart", intraday_days, INTRADAY_TTL)
+            )
+            if intraday_data is None:
+                intraday_data = get_crypto_intraday_data(
+                    symbol, from_date=intraday_from_date, to_date=to_date
+                )
+                if intraday_data:
+                    write_cached(symbol, "market_chart", intraday_days, intraday_data)
             if intraday_data:
                 save_crypto_data(symbol, intraday_data, output_dir, suffix="")
             else:
@@ -141,7 +160,10 @@ def fetch_all_crypto_data(
             print(f"✗ Error processing {symbol}: {e}\n")
 
         print("-" * 20)
-        time.sleep(2)
+
+    # Two symbols in flight at a time keeps well inside CoinGecko's free-tier rate limit
+    with ThreadPoolExecutor(max_workers=_MAX_CONCURRENT_SYMBOLS) as executor:
+        list(executor.map(fetch_symbol, symbols))
 
     print("=" * 60)
     print("✓ Cryptocurrency data fetch complete!")
@@ -154,6 +176,7 @@ if __name__ == "__main__":
     parser.add_argument("--symbols", type=str, default="BTC,ETH", help="Comma-separated list of crypto symbols.")
     parser.add_argument("--intraday_days", type=int, default=3, help="Number of days of high-granularity data.")
     parser.add_argument("--daily_days", type=int, default=180, help="Number of days of daily data for context.")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached API responses.")
     args = parser.parse_args()
     
     symbols_list = [s.strip().upper() for s in args.symbols.split(',')]
@@ -163,4 +186,5 @@ if __name__ == "__main__":
         intraday_days=args.intraday_days,
         daily_days=args.daily_days,
         output_dir="data",
+        refresh=args.refresh,
     )
@@ -3,21 +3,52 @@
 Unified data fetcher - checks for local CSV first, then falls back to APIs
 """
 
-import json
 import os
+import sys
 import time
 from datetime import datetime
 from pathlib import Path
 
+import orjson
 import requests
 from convert_csv_to_json import convert_all_csv_files
 from dotenv import load_dotenv
 from get_crypto_prices import fetch_all_crypto_data as fetch_from_coingecko
 
+# Make the project root importable when run as a script from data/
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from data.fetch_cache import DAILY_TTL, INTRADAY_TTL, read_cached, write_cached
+from data.http_session import SESSION
+
 load_dotenv()
 
+# Alpha Vantage's free tier allows 5 requests per minute
+_ALPHA_VANTAGE_INTERVAL = 12.0
+ALPHA_VANTAGE_URL = "https://www.alphavantage.co/query"
+
+
+class _RateLimiter:
+    """Spaces request starts at least `interval` seconds apart.
+
+    Unlike a fixed sleep after each call, time already spent on the request
+    and on writing its result counts towards the interval.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next_start = 0.0
+
+    def wait(self):
+        now = time.monotonic()
+        if self._next_start > now:
+            time.sleep(self._next_start - now)
+            now = self._next_start
+        self._next_start = now + self.interval
+
 
-def fetch_stock_data(symbols: list):
+def fetch_stock_data(symbols: list, refresh: bool = False):
     """
     Fetch daily and intraday stock data from Alpha Vantage.
     """
@@ -29,46 +60,63 @@ def fetch_stock_data(symbols: list):
         print("❌ ALPHAADVANTAGE_API_KEY environment variable not set. Cannot fetch stock data.")
         return
 
+    daily_params = {"function": "TIME_SERIES_DAILY", "outputsize": "full", "apikey": APIKEY}
+    intraday_params = {
+        "function": "TIME_SERIES_INTRADAY",
+        "interval": "60min",
+        "outputsize": "full",
+        "apikey": APIKEY,
+    }
+    limiter = _RateLimiter(_ALPHA_VANTAGE_INTERVAL)
     for symbol in symbols:
         print(f"--- Fetching data for {symbol} ---")
         try:
             # Fetch Daily Data
             print(f"Fetching DAILY data for {symbol}...")
-            daily_url = f"https://www.alphavantage.co/query?function=TIME_SERIES_DAILY&symbol={symbol}&outputsize=full&apikey={APIKEY}"
-            r_daily = requests.get(daily_url)
-            r_daily.raise_for_status()
-            daily_data = r_daily.json()
+            daily_data = None if refresh else read_cached(symbol, "TIME_SERIES_DAILY", "full", DAILY_TTL)
+            if daily_data is None:
+                limiter.wait()
+                r_daily = SESSION.get(ALPHA_VANTAGE_URL, params={**daily_params, "symbol": symbol})
+                r_daily.raise_for_status()
+                daily_data = orjson.loads(r_daily.content)
+                if "Time Series (Daily)" in daily_data:
+                    write_cached(symbol, "TIME_SERIES_DAILY", "full", daily_data)
             if "Time Series (Daily)" in daily_data:
-                with open(f"data/daily_prices_{symbol}_daily.json", "w") as f:
-                    json.dump(daily_data, f, indent=2)
+                with open(f"data/daily_prices_{symbol}_daily.json", "wb") as f:
+                    f.write(orjson.dumps(daily_data, option=orjson.OPT_INDENT_2))
                 print(f"✓ Saved DAILY data for {symbol}")
             else:
                 print(
                     f"⚠️  Could not fetch daily data for {symbol}: {daily_data.get('Information') or daily_data.get('Note')}"
                 )
 
-            time.sleep(12)  # Be nice to the free API
-
             # Fetch Intraday Data
             print(f"Fetching INTRADAY (60min) data for {symbol}...")
-            intraday_url = f"https://www.alphavantage.co/query?function=TIME_SERIES_INTRADAY&symbol={symbol}&interval=60min&outputsize=full&apikey={APIKEY}"
-            r_intraday = requests.get(intraday_url)
-            r_intraday.raise_for_status()
-            intraday_data = r_intraday.json()
+            intraday_data = (
+                None if refresh else read_cached(symbol, "TIME_SERIES_INTRADAY", "full", INTRADAY_TTL)
+            )
+            if intraday_data is None:
+                limiter.wait()
+                r_intraday = SESSION.get(
+                    ALPHA_VANTAGE_URL, params={**intraday_params, "symbol": symbol}
+                )
+                r_intraday.raise_for_status()
+                intraday_data = orjson.loads(r_intraday.content)
+                if "Time Series (60min)" in intraday_data:
+                    write_cached(symbol, "TIME_SERIES_INTRADAY", "full", intraday_data)
             if "Time Series (60min)" in intraday_data:
-                with open(f"data/daily_prices_{symbol}.json", "w") as f:
-                    json.dump(intraday_data, f, indent=2)
+                with open(f"data/daily_prices_{symbol}.json", "wb") as f:
+                    f.write(orjson.dumps(intraday_data, option=orjson.OPT_INDENT_2))
                 print(f"✓ Saved INTRADAY data for {symbol}")
             else:
                 print(
                     f"⚠️  Could not fetch intraday data for {symbol}: {intraday_data.get('Information') or intraday_data.get('Note')}"
                 )
 
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             print(f"✗ Error fetching data for {symbol}: {e}")
 
         print("-" * 20)
-        time.sleep(12)  # Be nice to the free API before the next symbol
 
 
 def fetch_futures_data(symbols: list):
@@ -79,20 +127,24 @@ def fetch_futures_data(symbols: list):
     print("DATA FETCHER - FUTURES HANDLER")
     print("=" * 60)
 
+    INTERVAL = "60min"
+    params = {
+        "function": "TIME_SERIES_INTRADAY",
+        "interval": INTERVAL,
+        "outputsize": "compact",
+        "entitlement": "delayed",
+        "apikey": os.getenv("ALPHAADVANTAGE_API_KEY"),
+    }
+    limiter = _RateLimiter(_ALPHA_VANTAGE_INTERVAL)
     for symbol in symbols:
         print(f"Fetching data for {symbol}...")
         api_symbol = f"{symbol}!" if symbol == "NQ1" else symbol
 
-        FUNCTION = "TIME_SERIES_INTRADAY"
-        INTERVAL = "60min"
-        OUTPUTSIZE = "compact"
-        APIKEY = os.getenv("ALPHAADVANTAGE_API_KEY")
-        url = f"https://www.alphavantage.co/query?function={FUNCTION}&symbol={api_symbol}&interval={INTERVAL}&outputsize={OUTPUTSIZE}&entitlement=delayed&apikey={APIKEY}"
-
         try:
-            r = requests.get(url)
+            limiter.wait()
+            r = SESSION.get(ALPHA_VANTAGE_URL, params={**params, "symbol": api_symbol})
             r.raise_for_status()
-            data = r.json()
+            data = orjson.loads(r.content)
 
             if "Note" in data or "Information" in data:
                 print(
@@ -100,31 +152,33 @@ def fetch_futures_data(symbols: list):
                 )
                 continue
 
-            time_series = data.get(f"Time Series ({INTERVAL})", {{}})
+            time_series = data.get(f"Time Series ({INTERVAL})", {})
 
-            formatted_data = {{}}
+            formatted_data = {}
             for timestamp, values in time_series.items():
-                formatted_data[timestamp] = {{
+                formatted_data[timestamp] = {
                     "open": float(values["1. open"]),
                     "high": float(values["2. high"]),
                     "low": float(values["3. low"]),
                     "close": float(values["4. close"]),
                     "volume": int(values["5. volume"]),
-                }}
+                }
 
             output_filename = f"data/future_prices_{symbol}.json"
-            with open(output_filename, "w", encoding="utf-8") as f:
-                json.dump(formatted_data, f, ensure_ascii=False, indent=4)
+            with open(output_filename, "wb") as f:
+                f.write(orjson.dumps(formatted_data, option=orjson.OPT_INDENT_2))
 
             print(f"Successfully saved data for {symbol} to {output_filename}")
 
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             print(f"Error fetching data for {symbol}: {e}")
         except (KeyError, TypeError) as e:
             print(f"Error processing data for {symbol}: {e}")
 
 
-def get_data(use_local_csv=True, asset_type="crypto", symbols=None, intraday_days=3):
+def get_data(
+    use_local_csv=True, asset_type="crypto", symbols=None, intraday_days=3, refresh=False
+):
     """
     Fetch market data - prefer local CSV, fall back to APIs
     """
@@ -140,7 +194,7 @@ def get_data(use_local_csv=True, asset_type="crypto", symbols=None, intraday_day
         return
 
     if asset_type == "stock":
-        fetch_stock_data(symbols)
+        fetch_stock_data(symbols, refresh=refresh)
         return
 
     if use_local_csv:
@@ -159,7 +213,11 @@ def get_data(use_local_csv=True, asset_type="crypto", symbols=None, intraday_day
         print(f"   Symbols: {', '.join(symbols)}")
         print(f"   Intraday Days: {intraday_days}\n")
         fetch_from_coingecko(
-            symbols=symbols, intraday_days=intraday_days, daily_days=180, output_dir="data"
+            symbols=symbols,
+            intraday_days=intraday_days,
+            daily_days=180,
+            output_dir="data",
+            refresh=refresh,
         )
         print("\n✅ Data fetched successfully from CoinGecko!")
     else:
@@ -173,6 +231,7 @@ if __name__ == "__main__":
     parser.add_argument("--no-csv", action="store_true", help="Skip local CSV, use API only")
     parser.add_argument("--asset-type", default="crypto", help="Asset type: crypto, stock, or futures")
     parser.add_argument("--symbols", default="BTC,ETH", help="Comma-separated symbols")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached API responses")
 
     args = parser.parse_args()
 
@@ -201,4 +260,5 @@ if __name__ == "__main__":
         asset_type=args.asset_type,
         symbols=symbols,
         intraday_days=intraday_days_to_fetch,
+        refresh=args.refresh,
     )
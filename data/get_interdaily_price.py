@@ -1,8 +1,14 @@
 import os
+import sys
 
-import requests
 from dotenv import load_dotenv
 
+# Make the project root importable when run as a script from data/
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from data.http_session import SESSION
+
 load_dotenv()
 import json
 
@@ -112,14 +118,20 @@ all_nasdaq_100_symbols = [
 ]
 
 
+# Shared query parameters; only the symbol changes per request
+_PARAMS = {
+    "function": "TIME_SERIES_INTRADAY",
+    "interval": "60min",
+    "outputsize": "compact",
+    "entitlement": "delayed",
+    "apikey": os.getenv("ALPHAADVANTAGE_API_KEY"),
+}
+
+
 def get_daily_price(SYMBOL: str):
-    # FUNCTION = "TIME_SERIES_DAILY"
-    FUNCTION = "TIME_SERIES_INTRADAY"
-    INTERVAL = "60min"
-    OUTPUTSIZE = "compact"
-    APIKEY = os.getenv("ALPHAADVANTAGE_API_KEY")
-    url = f"https://www.alphavantage.co/query?function={FUNCTION}&symbol={SYMBOL}&interval={INTERVAL}&outputsize={OUTPUTSIZE}&entitlement=delayed&apikey={APIKEY}"
-    r = requests.get(url)
+    r = SESSION.get(
+        "https://www.alphavantage.co/query", params={**_PARAMS, "symbol": SYMBOL}
+    )
     data = r.json()
     print(data)
     if data.get("Note") is not None or data.get("Information") is not None:
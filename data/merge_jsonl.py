@@ -147,8 +147,11 @@ with open(output_file, "w", encoding="utf-8") as fout:
                     series = value
                     break
             if isinstance(series, dict) and series:
-                # 先对所有日期做键名重命名
-                for d, bar in list(series.items()):
+                # 先对所有日期做键名重命名，同时记录最新日期
+                latest_date = ""
+                for d, bar in series.items():
+                    if d > latest_date:
+                        latest_date = d
                     if not isinstance(bar, dict):
                         continue
                     if "1. open" in bar:
@@ -156,7 +159,6 @@ with open(output_file, "w", encoding="utf-8") as fout:
                     if "4. close" in bar:
                         bar["4. sell price"] = bar.pop("4. close")
                 # 再处理最新日期，仅保留买入价
-                latest_date = max(series.keys())
                 latest_bar = series.get(latest_date, {})
                 if isinstance(latest_bar, dict):
                     buy_val = latest_bar.get("1. buy price")
@@ -2,11 +2,14 @@
 Unit tests for the BaseAgent class.
 """
 
+import asyncio
 import json
-from unittest.mock import patch, mock_open
+from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
+from agent.base_agent import base_agent
 from agent.base_agent.base_agent import BaseAgent
+from langchain_openai import ChatOpenAI
 
 @pytest.fixture
 def mock_agent():
@@ -20,25 +23,25 @@ def mock_agent():
     )
     return agent
 
-def test_get_position_summary_success(mock_agent):
+def test_get_position_summary_success(mock_agent, tmp_path):
     """
     Test the get_position_summary method for a successful case.
     """
-    # Mock the position file content
+    # Write the position file content
     position_data = [
         {"date": "2025-11-09", "id": 0, "positions": {"AAPL": 10, "CASH": 10000.0}},
         {"date": "2025-11-10", "id": 1, "positions": {"AAPL": 15, "CASH": 9250.0}},
     ]
-    mock_file_content = "\n".join(json.dumps(p) for p in position_data)
+    position_file = tmp_path / "position.jsonl"
+    position_file.write_text("\n".join(json.dumps(p) for p in position_data) + "\n")
+    mock_agent.position_file = str(position_file)
 
-    with patch("os.path.exists", return_value=True):
-        with patch("builtins.open", mock_open(read_data=mock_file_content)) as mock_file:
-            summary = mock_agent.get_position_summary()
+    summary = mock_agent.get_position_summary()
 
-            assert summary["signature"] == "test_agent"
-            assert summary["latest_date"] == "2025-11-10"
-            assert summary["total_records"] == 2
-            assert summary["positions"]["AAPL"] == 15
+    assert summary["signature"] == "test_agent"
+    assert summary["latest_date"] == "2025-11-10"
+    assert summary["total_records"] == 2
+    assert summary["positions"]["AAPL"] == 15
 
 def test_get_position_summary_no_file(mock_agent):
     """
@@ -49,12 +52,283 @@ def test_get_position_summary_no_file(mock_agent):
         assert "error" in summary
         assert "does not exist" in summary["error"]
 
-def test_get_position_summary_empty_file(mock_agent):
+def test_get_position_summary_empty_file(mock_agent, tmp_path):
     """
     Test the get_position_summary method when the position file is empty.
     """
-    with patch("os.path.exists", return_value=True):
-        with patch("builtins.open", mock_open(read_data="")) as mock_file:
-            summary = mock_agent.get_position_summary()
-            assert "error" in summary
-            assert "No position records" in summary["error"]
+    position_file = tmp_path / "position.jsonl"
+    position_file.write_text("")
+    mock_agent.position_file = str(position_file)
+
+    summary = mock_agent.get_position_summary()
+    assert "error" in summary
+    assert "No position records" in summary["error"]
+
+def test_load_tools_reuses_cached_catalog(mock_agent):
+    """
+    Test that agents with the same MCP config only discover tools once.
+    """
+    mock_agent.mcp_config = {"math": {"url": "http://localhost:8000/mcp"}}
+    mock_agent.client = MagicMock()
+    mock_agent.client.get_tools = AsyncMock(return_value=["add", "multiply"])
+
+    with patch.dict(base_agent._TOOL_CATALOG_CACHE, clear=True):
+        first = asyncio.run(mock_agent._load_tools())
+        second = asyncio.run(mock_agent._load_tools())
+
+    assert first == second == ["add", "multiply"]
+    mock_agent.client.get_tools.assert_awaited_once()
+
+def test_load_tools_skips_failing_server(mock_agent):
+    """
+    Test that one unreachable MCP server does not abort discovery on the others.
+    """
+    mock_agent.mcp_config = {
+        "math": {"url": "http://localhost:8000/mcp"},
+        "search": {"url": "http://localhost:8001/mcp"},
+    }
+
+    async def get_tools(server_name=None):
+        if server_name == "search":
+            raise ConnectionError("connection refused")
+        return ["add"]
+
+    mock_agent.client = MagicMock()
+    mock_agent.client.get_tools = AsyncMock(side_effect=get_tools)
+
+    with patch.dict(base_agent._TOOL_CATALOG_CACHE, clear=True):
+        tools = asyncio.run(mock_agent._load_tools())
+        assert tools == ["add"]
+        assert not base_agent._TOOL_CATALOG_CACHE
+
+def test_load_tools_discovers_each_config_separately(mock_agent):
+    """
+    Test that the catalog cache is keyed on the server config, not shared globally.
+    """
+    mock_agent.client = MagicMock()
+    mock_agent.client.get_tools = AsyncMock(return_value=["add"])
+
+    with patch.dict(base_agent._TOOL_CATALOG_CACHE, clear=True):
+        mock_agent.mcp_config = {"math": {"url": "http://localhost:8000/mcp"}}
+        asyncio.run(mock_agent._load_tools())
+        mock_agent.mcp_config = {"math": {"url": "http://localhost:9000/mcp"}}
+        asyncio.run(mock_agent._load_tools())
+
+    assert mock_agent.client.get_tools.await_count == 2
+
+def test_default_mcp_config_for_crypto():
+    """
+    Test that the default MCP config routes crypto agents to the crypto trade server.
+    """
+    config = BaseAgent._get_default_mcp_config("crypto", False)
+
+    assert config is BaseAgent._get_default_mcp_config("crypto", False)
+    assert set(config) == {"math", "search", "crypto_trade"}
+    assert config["crypto_trade"]["url"] == (
+        f"http://localhost:{base_agent._ENV['CRYPTO_TRADE_HTTP_PORT']}/mcp"
+    )
+    with pytest.raises(TypeError):
+        config["math"] = {}
+
+def test_log_messages_are_flushed_on_close(mock_agent, tmp_path):
+    """
+    Test that buffered session log entries are written out when the log is closed.
+    """
+    mock_agent.base_log_path = str(tmp_path)
+    log_file = mock_agent._setup_logging("2025-11-10_9")
+    mock_agent._log_message(log_file, [{"role": "user", "content": "hi"}])
+    mock_agent._log_message(log_file, [{"role": "assistant", "content": "hello"}])
+    mock_agent._close_log()
+
+    with open(log_file, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+    assert [e["new_messages"][0]["content"] for e in entries] == ["hi", "hello"]
+    assert entries[0]["signature"] == "test_agent"
+
+def test_read_last_jsonl_record_spans_blocks(tmp_path):
+    """
+    Test that the tail reader finds the last record when it crosses read blocks.
+    """
+    path = tmp_path / "position.jsonl"
+    records = [{"date": f"2025-11-{day:02d}", "id": day} for day in range(1, 21)]
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\n\n")
+
+    assert base_agent._read_last_jsonl_record(str(path), block_size=7) == records[-1]
+    path.write_text("")
+    assert base_agent._read_last_jsonl_record(str(path)) is None
+
+def test_latest_position_date_reads_last_record(mock_agent, tmp_path):
+    """
+    Test that the latest position date comes from the final record, or is None.
+    """
+    position_file = tmp_path / "position.jsonl"
+    mock_agent.position_file = str(position_file)
+    assert mock_agent._latest_position_date() is None
+
+    position_file.write_text(
+        '{"date": "2025-11-07", "id": 0}\n{"date": "2025-11-10", "id": 1}\n'
+    )
+    assert mock_agent._latest_position_date() == "2025-11-10"
+
+    position_file.write_text("\n")
+    assert mock_agent._latest_position_date() is None
+
+def test_get_chat_model_shares_instances():
+    """
+    Test that agents with identical provider settings share one chat model.
+    """
+    with patch.dict(base_agent._MODEL_CACHE, clear=True):
+        first = base_agent._get_chat_model(ChatOpenAI, "gpt-4o", None, "sk-test")
+        second = base_agent._get_chat_model(ChatOpenAI, "gpt-4o", None, "sk-test")
+        other = base_agent._get_chat_model(ChatOpenAI, "gpt-4o", None, "sk-other")
+
+    assert first is second
+    assert other is not first
+    assert other.http_async_client is first.http_async_client is base_agent._get_http_client()
+
+def test_get_chat_model_injects_http_client_only_for_openai():
+    """
+    Test that non-OpenAI model classes are built with the caller's kwargs untouched.
+    """
+
+    class FakeModel:
+        def __init__(self, **kwargs):
+            self.kwargs = kwargs
+
+    with patch.dict(base_agent._MODEL_CACHE, clear=True):
+        model = base_agent._get_chat_model(FakeModel, "local", None, None, temperature=0)
+
+    assert model.kwargs == {
+        "model": "local",
+        "base_url": None,
+        "api_key": None,
+        "temperature": 0,
+    }
+
+def test_tool_servers_drop_other_asset_types(mock_agent):
+    """
+    Test that a stock agent does not load crypto or futures trading tools.
+    """
+    mock_agent.mcp_config = {
+        "math": {},
+        "trade": {},
+        "crypto_trade": {},
+        "futures_trade": {},
+        "custom": {},
+    }
+    assert set(mock_agent._tool_servers()) == {"math", "trade", "custom"}
+
+def test_compact_history_elides_oldest_turns():
+    """
+    Test that long conversations keep the user query and recent turns verbatim.
+    """
+    messages = [{"role": "user", "content": "analyze today"}]
+    for step in range(6):
+        messages.append({"role": "assistant", "content": f"step {step} " + "x" * 100})
+        messages.append({"role": "user", "content": f"Tool results {step} " + "y" * 100})
+
+    compacted = base_agent._compact_history(messages, char_budget=800, keep_recent=2)
+
+    assert compacted[0] == messages[0]
+    assert compacted[-2:] == messages[-2:]
+    assert "chars elided" in compacted[1]["content"]
+    assert sum(len(m["content"]) for m in compacted) <= 800
+    assert base_agent._compact_history(messages[:3], char_budget=600) == messages[:3]
+
+def test_compact_history_is_best_effort_and_non_mutating():
+    """
+    Test that short turns stay verbatim, input is not mutated, and recent turns win.
+    """
+    messages = [
+        {"role": "user", "content": "analyze today"},
+        {"role": "assistant", "content": "ok"},
+        {"role": "user", "content": "z" * 500},
+        {"role": "assistant", "content": "w" * 500},
+    ]
+    original = [dict(m) for m in messages]
+
+    compacted = base_agent._compact_history(messages, char_budget=100, keep_recent=1)
+    assert compacted[1] == messages[1]
+    assert "500 chars elided" in compacted[2]["content"]
+    assert compacted[3] == messages[3]
+    assert messages == original
+
+    # Nothing outside the kept turns to elide: returned as-is, over budget
+    kept = base_agent._compact_history(messages, char_budget=100, keep_recent=3)
+    assert kept == messages
+
+def test_mcp_client_pool_and_per_server_locks():
+    """
+    Test that equal MCP configs share a client and same-server calls serialize.
+    """
+    config = {"math": {"transport": "streamable_http", "url": "http://localhost:8000/mcp"}}
+    with patch.dict(base_agent._MCP_POOL, clear=True):
+        assert base_agent._get_mcp_client(config) is base_agent._get_mcp_client(dict(config))
+
+    active = {"math": 0, "search": 0}
+    peak = {"math": 0, "search": 0}
+
+    async def handler(request):
+        active[request.server_name] += 1
+        peak[request.server_name] = max(peak[request.server_name], active[request.server_name])
+        await asyncio.sleep(0)
+        active[request.server_name] -= 1
+
+    async def run():
+        requests = [MagicMock(server_name=name) for name in ("math", "math", "search")]
+        await asyncio.gather(*(base_agent._serialize_per_server(r, handler) for r in requests))
+
+    with patch.dict(base_agent._MCP_SERVER_LOCKS, clear=True):
+        asyncio.run(run())
+    assert peak == {"math": 1, "search": 1}
+
+def test_split_response_matches_separate_extractors():
+    """
+    Test that the single-pass split agrees with the two extraction helpers.
+    """
+    from tools.general_tools import extract_conversation, extract_tool_messages
+
+    tool_msg = MagicMock(content="AAPL: 190.1", tool_call_id="call_1", response_metadata={})
+    tool_msg.name = "get_price_local"
+    response = {
+        "messages": [
+            {"role": "user", "content": "Trade today"},
+            {"content": "", "additional_kwargs": {"tool_calls": [{"id": "call_1"}]}},
+            tool_msg,
+            {"content": "Bought AAPL", "response_metadata": {"finish_reason": "stop"}},
+            {"content": "trailing note"},
+        ]
+    }
+    final, tools = base_agent._split_response(response)
+    assert final == extract_conversation(response, "final") == "Bought AAPL"
+    assert tools == extract_tool_messages(response) == [tool_msg]
+
+    response["messages"][3]["response_metadata"] = {}
+    assert base_agent._split_response(response)[0] == extract_conversation(response, "final")
+
+def test_split_response_edge_cases():
+    """
+    Test empty responses, dict tool messages and stop answers winning over later text.
+    """
+    assert base_agent._split_response({}) == (None, [])
+    assert base_agent._split_response(MagicMock(messages=None)) == (None, [])
+
+    tool_msg = {"content": "ok", "tool_call_id": "call_1"}
+    response = {
+        "messages": [
+            {"content": "Hold all", "response_metadata": {"finish_reason": "stop"}},
+            tool_msg,
+            {"content": "   "},
+            {"content": "later plain text"},
+        ]
+    }
+    assert base_agent._split_response(response) == ("Hold all", [tool_msg])
+
+def test_detect_provider():
+    """
+    Test provider lookup for API key and base URL defaults.
+    """
+    assert base_agent._detect_provider("deepseek-chat", None)[2] == "https://api.deepseek.com/v1"
+    assert base_agent._detect_provider("llama-3.1-70b", "https://api.groq.com/openai/v1")[0] == "GROQ_API_KEY"
+    assert base_agent._detect_provider("gpt-4o-mini", None)[1] == "OPENAI_API_BASE"
+    assert base_agent._detect_provider("claude-3-5-sonnet", None) == ("OPENAI_API_KEY", "OPENAI_API_BASE", None)
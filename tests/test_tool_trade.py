@@ -2,13 +2,12 @@
 Unit tests for the trade tool (tool_trade.py).
 """
 
-import json
 import os
-from unittest.mock import patch, mock_open
+from unittest.mock import patch
 
 import pytest
 
-from agent_tools import tool_trade
+from agent_tools import tool_futures_trade, tool_trade
 
 # --- Test Setup ---
 
@@ -30,19 +29,14 @@ def mock_env_and_positions():
 @patch('agent_tools.tool_trade.get_open_prices', return_value={"AAPL_price": 150.0})
 def test_buy_successful(mock_get_prices, mock_env_and_positions):
     """Test a successful buy operation."""
-    with patch("builtins.open", mock_open()) as mock_file:
+    with patch("agent_tools.tool_trade.append_jsonl") as mock_append:
         result = tool_trade.buy_logic(symbol="AAPL", amount=5)
 
         assert result["AAPL"] == 15
         assert result["CASH"] == 10000.0 - (150.0 * 5)
         
-        mock_file.assert_called_with(
-            os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "agent_data", "test_agent", "position", "position.jsonl"),
-            "a"
-        )
-        
-        written_content = mock_file().write.call_args[0][0]
-        log_data = json.loads(written_content.strip())
+        path, log_data = mock_append.call_args[0]
+        assert path == os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "agent_data", "test_agent", "position", "position.jsonl")
         
         assert log_data["this_action"]["action"] == "buy"
         assert log_data["positions"]["AAPL"] == 15
@@ -68,19 +62,14 @@ def test_buy_price_not_found(mock_get_prices, mock_env_and_positions):
 @patch('agent_tools.tool_trade.get_open_prices', return_value={"AAPL_price": 200.0})
 def test_sell_successful(mock_get_prices, mock_env_and_positions):
     """Test a successful sell operation."""
-    with patch("builtins.open", mock_open()) as mock_file:
+    with patch("agent_tools.tool_trade.append_jsonl") as mock_append:
         result = tool_trade.sell_logic(symbol="AAPL", amount=5)
 
         assert result["AAPL"] == 5
         assert result["CASH"] == 10000.0 + (200.0 * 5)
 
-        mock_file.assert_called_with(
-            os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "agent_data", "test_agent", "position", "position.jsonl"),
-            "a"
-        )
-        
-        written_content = mock_file().write.call_args[0][0]
-        log_data = json.loads(written_content.strip())
+        path, log_data = mock_append.call_args[0]
+        assert path == os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "agent_data", "test_agent", "position", "position.jsonl")
         
         assert log_data["this_action"]["action"] == "sell"
         assert log_data["positions"]["AAPL"] == 5
@@ -99,4 +88,55 @@ def test_sell_stock_not_owned(mock_get_prices, mock_env_and_positions):
     result = tool_trade.sell_logic(symbol="MSFT", amount=5)
     
     assert "error" in result
-    assert "No position" in result["error"]
\ No newline at end of file
+    assert "No position" in result["error"]
+
+
+# --- Tests for buy_futures() / sell_futures() ---
+
+@pytest.fixture
+def mock_futures_env():
+    """Pytest fixture to mock config, position and candle data for futures trades."""
+    config = {"SIGNATURE": "test_agent", "TODAY_DATE": "2025-11-10"}
+    initial_positions = {"ES": 2, "CASH": 1_000_000.0}
+    module = "agent_tools.tool_futures_trade"
+    with (
+        patch(f"{module}.get_config_value", side_effect=config.get),
+        patch(f"{module}.get_latest_position", return_value=(initial_positions, 0)),
+        patch(f"{module}.get_futures_candles_on_date", return_value=[]),
+        patch(f"{module}.get_futures_price_on_date", return_value=5000.0),
+    ):
+        yield
+
+
+@pytest.mark.parametrize("contracts", [0, -1])
+def test_futures_rejects_non_positive_contracts(contracts, mock_futures_env):
+    """Test that zero or negative contract counts are refused before any trade."""
+    with patch("agent_tools.tool_futures_trade.append_jsonl") as mock_append:
+        bought = tool_futures_trade.buy_futures.fn("ES", contracts)
+        sold = tool_futures_trade.sell_futures.fn("ES", contracts)
+
+    assert "Contracts must be positive" in bought["error"]
+    assert "Contracts must be positive" in sold["error"]
+    mock_append.assert_not_called()
+
+
+def test_buy_futures_scales_cost_by_multiplier(mock_futures_env):
+    """Test that buying one ES contract costs price times the $50 multiplier."""
+    with patch("agent_tools.tool_futures_trade.append_jsonl") as mock_append:
+        result = tool_futures_trade.buy_futures.fn(futures_symbol="ES", contracts=1)
+
+    assert result["cost_per_contract"] == 5000.0 * 50
+    assert result["new_cash"] == 1_000_000.0 - 250_000.0
+    assert result["positions"]["ES"] == 3
+    _, log_data = mock_append.call_args[0]
+    assert log_data["total_cost"] == 250_000.0
+
+
+def test_sell_futures_scales_proceeds_by_multiplier(mock_futures_env):
+    """Test that selling one ES contract credits price times the $50 multiplier."""
+    with patch("agent_tools.tool_futures_trade.append_jsonl"):
+        result = tool_futures_trade.sell_futures.fn(futures_symbol="ES", contracts=1)
+
+    assert result["total_proceeds"] == 5000.0 * 50
+    assert result["new_cash"] == 1_000_000.0 + 250_000.0
+    assert result["positions"]["ES"] == 1
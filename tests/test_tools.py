@@ -86,6 +86,50 @@ class TestMergedData:
                             data, dict
                         ), "Each JSONL line should be a JSON object"
 
+    def test_symbol_index_points_at_symbol_line(self, tmp_path):
+        """Test that indexed lookups return the first document for each symbol."""
+        from agent_tools.tool_get_price_local import _load_symbol_doc
+
+        merged = tmp_path / "merged.jsonl"
+        docs = [
+            {
+                "Meta Data": {"2. Symbol": "AAPL"},
+                "Time Series (Daily)": {"2025-10-30": {"4. sell price": "271.40"}},
+            },
+            {"2025-10-30": {"close": 1.0}},
+            {
+                "Meta Data": {"2. Symbol": "MSFT"},
+                "Time Series (Daily)": {"2025-10-30": {"4. sell price": "541.55"}},
+            },
+        ]
+        merged.write_text("\n".join(json.dumps(d) for d in docs) + "\n")
+        st = merged.stat()
+
+        msft = _load_symbol_doc(str(merged), st.st_mtime_ns, st.st_size, "MSFT")
+        assert msft == docs[2]
+        assert _load_symbol_doc(str(merged), st.st_mtime_ns, st.st_size, "NVDA") is None
+
+    def test_open_prices_skip_other_symbols_before_parsing(self, tmp_path):
+        """Test that the symbol prefilter keeps only wanted documents."""
+        from tools.price_tools import get_open_prices
+
+        merged = tmp_path / "merged.jsonl"
+        docs = [
+            {
+                "Meta Data": {"2. Symbol": "AAPL"},
+                "Time Series (Daily)": {"2025-10-30": {"1. buy price": "271.40"}},
+            },
+            {
+                "Meta Data": {"2. Symbol": "MSFT"},
+                "Time Series (Daily)": {"2025-10-30": {"1. buy price": "541.55"}},
+            },
+        ]
+        merged.write_text("\n".join(json.dumps(d) for d in docs) + "\nnot json AAPL\n")
+
+        assert get_open_prices("2025-10-30", ["MSFT", "NVDA"], str(merged)) == {
+            "MSFT_price": 541.55
+        }
+
 
 class TestAgentData:
     """Test agent trading data."""
@@ -125,3 +169,244 @@ class TestDataIntegrity:
     def test_main_script_exists(self):
         """Test that main.sh script exists."""
         assert os.path.exists("main.sh"), "main.sh script not found"
+
+
+class TestGeneralTools:
+    """Test shared helpers in tools.general_tools."""
+
+    def test_append_jsonl_records_are_visible_immediately(self, tmp_path):
+        """Test that appended records can be read back before the handle closes."""
+        from tools.general_tools import append_jsonl
+
+        path = str(tmp_path / "position" / "position.jsonl")
+        append_jsonl(path, {"id": 0, "positions": {"CASH": 10000.0}})
+        append_jsonl(path, {"id": 1, "positions": {"CASH": 9000.0, "BTC": 0.1}})
+
+        with open(path, "r") as f:
+            records = [json.loads(line) for line in f]
+        assert [r["id"] for r in records] == [0, 1]
+        assert records[1]["positions"]["BTC"] == 0.1
+
+    def test_append_jsonl_recreates_deleted_file(self, tmp_path):
+        """Test that a record appended after the file is removed is not lost."""
+        import shutil
+
+        from tools.general_tools import append_jsonl
+
+        path = str(tmp_path / "position" / "position.jsonl")
+        append_jsonl(path, {"id": 0})
+        shutil.rmtree(tmp_path / "position")
+        append_jsonl(path, {"id": 1})
+
+        with open(path, "r") as f:
+            records = [json.loads(line) for line in f]
+        assert [r["id"] for r in records] == [1]
+
+    def test_append_jsonl_follows_rotated_file(self, tmp_path):
+        """Test that appends after a rename go to the new file, not the rotated one."""
+        from tools.general_tools import append_jsonl
+
+        path = tmp_path / "position.jsonl"
+        append_jsonl(str(path), {"id": 0})
+        path.rename(tmp_path / "position.jsonl.1")
+        append_jsonl(str(path), {"id": 1})
+
+        current = path.read_text().splitlines()
+        rotated = (tmp_path / "position.jsonl.1").read_text().splitlines()
+        assert [json.loads(line)["id"] for line in current] == [1]
+        assert [json.loads(line)["id"] for line in rotated] == [0]
+
+    def test_trunc_marks_only_cut_strings(self):
+        """Test that trunc appends an ellipsis only when it shortens the string."""
+        from tools.general_tools import trunc
+
+        assert trunc("short", 10) == "short"
+        assert trunc("x" * 12, 10) == "x" * 10 + "..."
+
+    def test_runtime_env_is_reread_after_write(self, tmp_path, monkeypatch):
+        """Test that cached runtime config picks up values written afterwards."""
+        from tools.general_tools import get_config_value, write_config_value
+
+        monkeypatch.setenv("RUNTIME_ENV_PATH", str(tmp_path / "runtime_env.json"))
+        write_config_value("TODAY_DATE", "2025-11-10")
+        assert get_config_value("TODAY_DATE") == "2025-11-10"
+        write_config_value("TODAY_DATE", "2025-11-11")
+        assert get_config_value("TODAY_DATE") == "2025-11-11"
+
+    def test_unchanged_config_value_skips_rewrite(self, tmp_path, monkeypatch):
+        """Test that writing the value already on disk leaves the file untouched."""
+        from tools.general_tools import get_config_value, write_config_value
+
+        env_path = tmp_path / "runtime_env.json"
+        monkeypatch.setenv("RUNTIME_ENV_PATH", str(env_path))
+        write_config_value("IF_TRADE", True)
+        os.utime(env_path, ns=(0, 0))
+        write_config_value("IF_TRADE", True)
+        assert env_path.stat().st_mtime_ns == 0
+        write_config_value("IF_TRADE", False)
+        assert get_config_value("IF_TRADE") is False
+
+    def test_runtime_env_copies_do_not_leak_into_cache(self, tmp_path, monkeypatch):
+        """Test that lookups share one parse while loaded copies stay private."""
+        from tools.general_tools import (
+            _load_runtime_env,
+            get_config_value,
+            write_config_value,
+        )
+
+        monkeypatch.setenv("RUNTIME_ENV_PATH", str(tmp_path / "runtime_env.json"))
+        write_config_value("SIGNATURE", "agent-a")
+        _load_runtime_env()["SIGNATURE"] = "mutated"
+        assert get_config_value("SIGNATURE") == "agent-a"
+
+
+class TestPositionTools:
+    """Test position lookups in tools.price_tools."""
+
+    def test_latest_position_cache_follows_file_changes(self, tmp_path):
+        """Test that a new record changes the cache key and is picked up."""
+        from tools.general_tools import append_jsonl
+        from tools.price_tools import _read_latest_position
+
+        path = str(tmp_path / "position.jsonl")
+        append_jsonl(
+            path, {"date": "2025-11-10", "id": 0, "positions": {"CASH": 100.0}}
+        )
+        st = os.stat(path)
+        first = _read_latest_position(path, "2025-11-10", st.st_mtime_ns, st.st_size)
+        assert first == ({"CASH": 100.0}, 0)
+        assert (
+            _read_latest_position(path, "2025-11-10", st.st_mtime_ns, st.st_size)
+            is first
+        )
+
+        append_jsonl(path, {"date": "2025-11-10", "id": 1, "positions": {"CASH": 50.0}})
+        st = os.stat(path)
+        assert _read_latest_position(
+            path, "2025-11-10", st.st_mtime_ns, st.st_size
+        ) == (
+            {"CASH": 50.0},
+            1,
+        )
+
+    def test_position_frame_keeps_latest_record_per_date(self, tmp_path):
+        """Test that the columnar position frame holds each date's highest-id record."""
+        from tools.result_tools import load_position_frame
+
+        path = tmp_path / "position.jsonl"
+        records = [
+            {"date": "2025-11-10", "id": 1, "positions": {"CASH": 900.0, "AAPL": 1}},
+            {"date": "2025-11-10", "id": 0, "positions": {"CASH": 1000.0}},
+            {"date": "2025-11-11", "id": 2, "positions": {"CASH": 700.0, "MSFT": 2}},
+        ]
+        path.write_text("\n".join(json.dumps(r) for r in records) + "\n")
+
+        frame = load_position_frame(path)
+        assert list(frame.index) == ["2025-11-10", "2025-11-11"]
+        assert frame.loc["2025-11-10", "CASH"] == 900.0
+        assert frame.loc["2025-11-10", "MSFT"] == 0.0
+        assert frame.loc["2025-11-11", "MSFT"] == 2.0
+
+
+class TestFuturesTools:
+    """Test futures price loading in tools.futures_tools."""
+
+    def test_intraday_data_is_cached_until_file_changes(self, tmp_path):
+        """Test that the parsed file is reused until it is rewritten."""
+        from tools.futures_tools import load_futures_intraday_data
+
+        price_file = tmp_path / "future_prices_NQ1.json"
+        price_file.write_text(json.dumps({"2025-01-02 09:30:00": {"close": 1.0}}))
+        first = load_futures_intraday_data("NQ1", data_dir=str(tmp_path))
+        assert load_futures_intraday_data("NQ1", data_dir=str(tmp_path)) is first
+
+        price_file.write_text(json.dumps({"2025-01-02 09:30:00": {"close": 12.5}}))
+        reloaded = load_futures_intraday_data("NQ1", data_dir=str(tmp_path))
+        assert reloaded["2025-01-02 09:30:00"]["close"] == 12.5
+
+    def test_candles_on_date_are_sorted_and_filtered(self, tmp_path):
+        """Test that the per-date index returns only that day's candles in order."""
+        from tools.futures_tools import get_futures_candles_on_date
+
+        (tmp_path / "future_prices_ES.json").write_text(
+            json.dumps(
+                {
+                    "2025-01-02 09:35:00": {"close": 2.0},
+                    "2025-01-03 09:30:00": {"close": 3.0},
+                    "2025-01-02 09:30:00": {"close": 1.0},
+                }
+            )
+        )
+        candles = get_futures_candles_on_date(
+            "ES", "2025-01-02", data_dir=str(tmp_path)
+        )
+        assert [ts for ts, _ in candles] == [
+            "2025-01-02 09:30:00",
+            "2025-01-02 09:35:00",
+        ]
+        assert (
+            get_futures_candles_on_date("ES", "2025-01-09", data_dir=str(tmp_path))
+            == []
+        )
+
+
+class TestCryptoTools:
+    """Test crypto price loading in tools.crypto_tools."""
+
+    def test_price_data_is_cached_with_sorted_timestamps(self, tmp_path):
+        """Test that the parsed file and sorted timestamps are reused until rewrite."""
+        from tools.crypto_tools import _load_crypto_prices, load_crypto_price_data
+
+        price_file = tmp_path / "crypto_prices_BTC.json"
+        price_file.write_text(
+            json.dumps(
+                {
+                    "2025-01-02 12:00:00": {"open": 2.0},
+                    "2025-01-02 00:00:00": {"open": 1.0},
+                }
+            )
+        )
+        first = load_crypto_price_data("BTC", data_dir=str(tmp_path))
+        assert load_crypto_price_data("BTC", data_dir=str(tmp_path)) is first
+        assert _load_crypto_prices("BTC", str(tmp_path))[1] == [
+            "2025-01-02 00:00:00",
+            "2025-01-02 12:00:00",
+        ]
+
+        price_file.write_text(json.dumps({"2025-01-03 00:00:00": {"open": 3.0}}))
+        assert "2025-01-03 00:00:00" in load_crypto_price_data(
+            "BTC", data_dir=str(tmp_path)
+        )
+
+
+class TestFetchCache:
+    """Test the on-disk API response cache in data.fetch_cache."""
+
+    def test_cached_payload_is_served_until_ttl_expires(self, tmp_path, monkeypatch):
+        """Test that fresh entries hit and entries older than the TTL miss."""
+        from data import fetch_cache
+
+        monkeypatch.setattr(fetch_cache, "CACHE_DIR", tmp_path)
+        assert fetch_cache.read_cached("BTC", "ohlc", 180, ttl=60) is None
+
+        fetch_cache.write_cached("BTC", "ohlc", 180, {"2025-01-02": {"close": 1.0}})
+        assert fetch_cache.read_cached("BTC", "ohlc", 180, ttl=60) == {
+            "2025-01-02": {"close": 1.0}
+        }
+        # A different days value is a different key
+        assert fetch_cache.read_cached("BTC", "ohlc", 3, ttl=60) is None
+
+        (cache_file,) = tmp_path.iterdir()
+        stale = cache_file.stat().st_mtime - 120
+        os.utime(cache_file, (stale, stale))
+        assert fetch_cache.read_cached("BTC", "ohlc", 180, ttl=60) is None
+
+    def test_cache_dir_does_not_depend_on_cwd(self, tmp_path, monkeypatch):
+        """Test that the cache lives next to the data scripts, not in the cwd."""
+        from pathlib import Path
+
+        from data import fetch_cache
+
+        monkeypatch.chdir(tmp_path)
+        data_dir = Path(fetch_cache.__file__).resolve().parent
+        assert fetch_cache.CACHE_DIR == data_dir / ".cache"
@@ -2,20 +2,30 @@
 Cryptocurrency trading tools for BTC and ETH
 """
 
-import json
+import bisect
+import functools
 import os
-from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+
+import orjson
 
 # Supported cryptocurrencies
 SUPPORTED_CRYPTOS = ["BTC", "ETH"]
 
 
-def load_crypto_price_data(crypto_symbol: str, data_dir: str = "data") -> Dict:
+@functools.lru_cache(maxsize=16)
+def _load_price_file(price_file: str, mtime_ns: int, size: int) -> Tuple[Dict, List[str]]:
     """
-    Load cryptocurrency intraday price data from JSON file.
+    Parse a price file once per version, along with its sorted timestamps.
+    Callers must treat the result as read-only.
     """
+    with open(price_file, "rb") as f:
+        data = orjson.loads(f.read())
+    return data, sorted(data)
+
+
+def _load_crypto_prices(crypto_symbol: str, data_dir: str) -> Tuple[Dict, List[str]]:
     if crypto_symbol not in SUPPORTED_CRYPTOS:
         raise ValueError(f"Unsupported cryptocurrency: {crypto_symbol}")
 
@@ -23,14 +33,21 @@ def load_crypto_price_data(crypto_symbol: str, data_dir: str = "data") -> Dict:
 
     if not os.path.exists(price_file):
         print(f"⚠️  Price data not found for {crypto_symbol}: {price_file}")
-        return {}
+        return {}, []
 
     try:
-        with open(price_file, "r") as f:
-            return json.load(f)
+        stat = os.stat(price_file)
+        return _load_price_file(price_file, stat.st_mtime_ns, stat.st_size)
     except Exception as e:
         print(f"Error loading {crypto_symbol} data: {e}")
-        return {}
+        return {}, []
+
+
+def load_crypto_price_data(crypto_symbol: str, data_dir: str = "data") -> Dict:
+    """
+    Load cryptocurrency intraday price data from JSON file.
+    """
+    return _load_crypto_prices(crypto_symbol, data_dir)[0]
 
 
 def load_crypto_daily_price_data(crypto_symbol: str, data_dir: str = "data") -> Dict:
@@ -47,8 +64,8 @@ def load_crypto_daily_price_data(crypto_symbol: str, data_dir: str = "data") ->
         return {}
 
     try:
-        with open(price_file, "r") as f:
-            return json.load(f)
+        stat = os.stat(price_file)
+        return _load_price_file(price_file, stat.st_mtime_ns, stat.st_size)[0]
     except Exception as e:
         print(f"Error loading daily {crypto_symbol} data: {e}")
         return {}
@@ -60,23 +77,12 @@ def get_crypto_price_on_date(
     """
     Get the latest cryptocurrency price on a specific date from intraday data.
     """
-    data = load_crypto_price_data(crypto_symbol)
+    data, timestamps = _load_crypto_prices(crypto_symbol, "data")
 
-    latest_datetime_str = None
-    latest_dt = None
-
-    for dt_str in data.keys():
-        if dt_str.startswith(target_date):
-            try:
-                dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                dt = datetime.strptime(dt_str, "%Y-%m-%d")
-            if latest_dt is None or dt > latest_dt:
-                latest_dt = dt
-                latest_datetime_str = dt_str
-
-    if latest_datetime_str:
-        return data[latest_datetime_str].get(price_type, None)
+    # Timestamps on target_date form one contiguous run of the sorted keys
+    end = bisect.bisect_right(timestamps, target_date + "\uffff")
+    if end and timestamps[end - 1].startswith(target_date):
+        return data[timestamps[end - 1]].get(price_type, None)
 
     return None
 
@@ -5,6 +5,7 @@ Provides detailed visibility into agent reasoning and execution
 
 import json
 import logging
+import os
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -41,12 +42,15 @@ class TradeLogger:
     def __init__(self, log_file: Optional[str] = None):
         self.log_file = log_file
         self.step_counter = 0
+        self.verbose = os.getenv("AI_TRADER_VERBOSE", "1") == "1"
 
     def header(self, title: str):
         """Print section header"""
-        print(f"\n{Colors.BOLD}{Colors.CYAN}{'='*70}")
-        print(f"{title.center(70)}")
-        print(f"{'='*70}{Colors.RESET}\n")
+        print(
+            f"\n{Colors.BOLD}{Colors.CYAN}{'='*70}\n"
+            f"{title.center(70)}\n"
+            f"{'='*70}{Colors.RESET}\n"
+        )
 
     def subheader(self, title: str):
         """Print subsection header"""
@@ -63,39 +67,37 @@ class TradeLogger:
 
     def thinking(self, thought: str):
         """Log AI thinking/reasoning"""
-        print(f"{Colors.MAGENTA}💭 AI Thinking:{Colors.RESET}")
-        for line in thought.split("\n"):
-            if line.strip():
-                print(f"   {line}")
+        lines = [f"{Colors.MAGENTA}💭 AI Thinking:{Colors.RESET}"]
+        lines.extend(f"   {line}" for line in thought.split("\n") if line.strip())
+        print("\n".join(lines))
 
     def tool_call(self, tool_name: str, args: Dict[str, Any]):
         """Log tool function call"""
         args_str = json.dumps(args, indent=2)
-        print(f"{Colors.BRIGHT_BLUE}🔧 Calling tool: {tool_name}{Colors.RESET}")
-        for line in args_str.split("\n"):
-            print(f"   {line}")
+        lines = [f"{Colors.BRIGHT_BLUE}🔧 Calling tool: {tool_name}{Colors.RESET}"]
+        lines.extend(f"   {line}" for line in args_str.split("\n"))
+        print("\n".join(lines))
 
     def tool_result(self, tool_name: str, result: Any, success: bool = True):
         """Log tool result"""
         status_icon = "✅" if success else "❌"
         status_color = Colors.GREEN if success else Colors.RED
 
-        print(
-            f"{status_color}{status_icon} Tool result from {tool_name}:{Colors.RESET}"
-        )
-
         if isinstance(result, dict):
             result_str = json.dumps(result, indent=2)
         else:
             result_str = str(result)
 
         lines = result_str.split("\n")
-        for line in lines[:20]:  # Limit output
-            print(f"   {line}")
+        out = [
+            f"{status_color}{status_icon} Tool result from {tool_name}:{Colors.RESET}"
+        ]
+        out.extend(f"   {line}" for line in lines[:20])  # Limit output
 
         if len(lines) > 20:
             remaining = len(lines) - 20
-            print(f"   ... ({remaining} more lines)")
+            out.append(f"   ... ({remaining} more lines)")
+        print("\n".join(out))
 
     def error(self, error_msg: str, error_type: str = "Error"):
         """Log error with emphasis"""
@@ -113,11 +115,16 @@ class TradeLogger:
         """Log info message"""
         print(f"{Colors.CYAN}ℹ️  {message}{Colors.RESET}")
 
+    def debug(self, message: str, *args: Any):
+        """Log verbose detail; %-style args are only formatted when AI_TRADER_VERBOSE is on"""
+        if self.verbose:
+            print(message % args if args else message)
+
     def market_data(self, symbol: str, data: Dict[str, Any]):
         """Log market data"""
-        print(f"{Colors.BRIGHT_CYAN}📊 Market Data for {symbol}:{Colors.RESET}")
-        for key, value in data.items():
-            print(f"   {key}: {value}")
+        lines = [f"{Colors.BRIGHT_CYAN}📊 Market Data for {symbol}:{Colors.RESET}"]
+        lines.extend(f"   {key}: {value}" for key, value in data.items())
+        print("\n".join(lines))
 
     def position(self, symbol: str, quantity: float, price: float, value: float):
         """Log position information"""
@@ -2,11 +2,13 @@
 Futures trading tools for NQ1!, ES, and other CME futures contracts
 """
 
-import json
+import functools
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+
+import orjson
 
 # Supported futures contracts
 SUPPORTED_FUTURES = [
@@ -22,13 +24,25 @@ SUPPORTED_FUTURES = [
     "ZC",
     "ZW",
 ]
+# Hashed view for validation; the list keeps the display/iteration order
+_SUPPORTED_FUTURES_SET = frozenset(SUPPORTED_FUTURES)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_price_file(price_file: str, mtime_ns: int, size: int) -> Dict:
+    """
+    Parse a price file once per version; mtime/size in the key drop stale entries
+    when the file is regenerated. Callers must treat the result as read-only.
+    """
+    with open(price_file, "rb") as f:
+        return orjson.loads(f.read())
 
 
 def load_futures_intraday_data(futures_symbol: str, data_dir: str = "data") -> Dict:
     """
     Load futures intraday price data from JSON file
     """
-    if futures_symbol not in SUPPORTED_FUTURES:
+    if futures_symbol not in _SUPPORTED_FUTURES_SET:
         raise ValueError(f"Unsupported futures contract: {futures_symbol}")
 
     price_file = os.path.join(data_dir, f"future_prices_{futures_symbol}.json")
@@ -38,19 +52,56 @@ def load_futures_intraday_data(futures_symbol: str, data_dir: str = "data") -> D
         return {}
 
     try:
-        with open(price_file, "r") as f:
-            data = json.load(f)
-        return data
+        stat = os.stat(price_file)
+        return _load_price_file(price_file, stat.st_mtime_ns, stat.st_size)
     except Exception as e:
         print(f"Error loading intraday {futures_symbol} data: {e}")
         return {}
 
 
+@functools.lru_cache(maxsize=32)
+def _index_price_file(
+    price_file: str, mtime_ns: int, size: int
+) -> Dict[str, List[Tuple[str, Dict]]]:
+    """
+    Group a price file's candles by date, each day sorted by timestamp
+    """
+    index: Dict[str, List[Tuple[str, Dict]]] = {}
+    for dt_str, ohlc in sorted(_load_price_file(price_file, mtime_ns, size).items()):
+        index.setdefault(dt_str[:10], []).append((dt_str, ohlc))
+    return index
+
+
+def get_futures_candles_on_date(
+    futures_symbol: str, target_date: str, data_dir: str = "data"
+) -> List[Tuple[str, Dict]]:
+    """
+    Get the (timestamp, OHLC) candles for one date, sorted by timestamp
+    """
+    if futures_symbol not in _SUPPORTED_FUTURES_SET:
+        raise ValueError(f"Unsupported futures contract: {futures_symbol}")
+
+    price_file = os.path.join(data_dir, f"future_prices_{futures_symbol}.json")
+
+    if not os.path.exists(price_file):
+        print(f"⚠️  Intraday price data not found for {futures_symbol}: {price_file}")
+        return []
+
+    try:
+        stat = os.stat(price_file)
+        return _index_price_file(price_file, stat.st_mtime_ns, stat.st_size).get(
+            target_date, []
+        )
+    except Exception as e:
+        print(f"Error loading intraday {futures_symbol} data: {e}")
+        return []
+
+
 def load_futures_daily_data(futures_symbol: str, data_dir: str = "data") -> Dict:
     """
     Load futures daily price data from JSON file
     """
-    if futures_symbol not in SUPPORTED_FUTURES:
+    if futures_symbol not in _SUPPORTED_FUTURES_SET:
         raise ValueError(f"Unsupported futures contract: {futures_symbol}")
 
     price_file = os.path.join(data_dir, f"future_prices_{futures_symbol}_daily.json")
@@ -60,9 +111,8 @@ def load_futures_daily_data(futures_symbol: str, data_dir: str = "data") -> Dict
         return {}
 
     try:
-        with open(price_file, "r") as f:
-            data = json.load(f)
-        return data
+        stat = os.stat(price_file)
+        return _load_price_file(price_file, stat.st_mtime_ns, stat.st_size)
     except Exception as e:
         print(f"Error loading daily {futures_symbol} data: {e}")
         return {}
@@ -113,16 +163,17 @@ def get_futures_price_at_time(
     closest_dt = None
     min_diff = float("inf")
 
-    for dt_str in data.keys():
-        if dt_str.startswith(target_date):
-            dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
-            diff = abs((dt - target_dt).total_seconds())
-            if diff < min_diff:
-                min_diff = diff
-                closest_dt = dt
+    closest_ohlc = None
+    for dt_str, ohlc in get_futures_candles_on_date(futures_symbol, target_date):
+        dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
+        diff = abs((dt - target_dt).total_seconds())
+        if diff < min_diff:
+            min_diff = diff
+            closest_dt = dt
+            closest_ohlc = ohlc
 
     if closest_dt:
-        return data[closest_dt.strftime("%Y-%m-%d %H:%M:%S")].get(price_type)
+        return closest_ohlc.get(price_type)
 
     return None
 
@@ -140,19 +191,15 @@ def format_futures_price_data(futures_symbol: str, target_date: str) -> str:
     """
     Format futures price data for display in agent prompt.
     """
-    data = load_futures_intraday_data(futures_symbol)
-
     formatted_prices = []
-    for dt_str, price_data in sorted(data.items()):
-        if dt_str.startswith(target_date):
-            prices = price_data
-            formatted_prices.append(
-                f"""{futures_symbol} ({prices.get('date')}):
+    for _, prices in get_futures_candles_on_date(futures_symbol, target_date):
+        formatted_prices.append(
+            f"""{futures_symbol} ({prices.get('date')}):
   Open:  ${prices.get('open', 'N/A'):,.2f}
   High:  ${prices.get('high', 'N/A'):,.2f}
   Low:   ${prices.get('low', 'N/A'):,.2f}
   Close: ${prices.get('close', 'N/A'):,.2f}"""
-            )
+        )
 
     if formatted_prices:
         return "\n".join(formatted_prices)
@@ -213,8 +260,7 @@ def get_futures_price_summary(futures_symbols: list = None) -> str:
     for symbol in futures_symbols:
         data = load_futures_intraday_data(symbol)
         if data:
-            dates = sorted(data.keys())
-            latest_price = data[dates[-1]]["close"]
+            latest_price = data[max(data)]["close"]
             summary += f"{symbol}: {len(data)} candles | Latest: ${latest_price:,.2f}\n"
         else:
             summary += f"{symbol}: No data available\n"
@@ -1,30 +1,50 @@
+import atexit
+import functools
 import json
 import os
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict
 
+import orjson
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# O_APPEND descriptors for JSONL record files, reused while the path still names them
+_APPEND_FDS: Dict[str, int] = {}
+
 
 def _load_runtime_env() -> dict:
+    return dict(_runtime_env_view())
+
+
+def _runtime_env_view() -> dict:
+    # Shared cached parse of the runtime env file; callers must not mutate it
     path = os.environ.get("RUNTIME_ENV_PATH")
     if path is None:
         return {}
     try:
-        if os.path.exists(path):
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, dict):
-                    return data
+        stat = os.stat(path)
+    except OSError:
+        return {}
+    return _read_runtime_env(path, stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=4)
+def _read_runtime_env(path: str, mtime_ns: int, size: int) -> dict:
+    # Parsed once per file version; MCP tools read this file on every call
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+            if isinstance(data, dict):
+                return data
     except Exception:
         pass
     return {}
 
 
 def get_config_value(key: str, default=None):
-    _RUNTIME_ENV = _load_runtime_env()
+    _RUNTIME_ENV = _runtime_env_view()
 
     if key in _RUNTIME_ENV:
         return _RUNTIME_ENV[key]
@@ -38,7 +58,12 @@ def write_config_value(key: str, value: Any):
             f"⚠️  WARNING: RUNTIME_ENV_PATH not set, config value '{key}' not persisted"
         )
         return
+    # Writes always start from the file, never from a cached parse
+    _read_runtime_env.cache_clear()
     _RUNTIME_ENV = _load_runtime_env()
+    # Trades set IF_TRADE on every call; skip the rewrite when nothing changes
+    if key in _RUNTIME_ENV and _RUNTIME_ENV[key] == value:
+        return
     _RUNTIME_ENV[key] = value
     try:
         with open(path, "w", encoding="utf-8") as f:
@@ -47,6 +72,59 @@ def write_config_value(key: str, value: Any):
         print(f"❌ Error writing config to {path}: {e}")
 
 
+def trunc(s: str, n: int) -> str:
+    """Return s cut to n characters, with "..." appended only when something was cut."""
+    return s if len(s) <= n else f"{s[:n]}..."
+
+
+def _open_append(path: str) -> int:
+    flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+    try:
+        return os.open(path, flags, 0o644)
+    except FileNotFoundError:
+        # Only a missing parent directory gets here; create it and retry once
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return os.open(path, flags, 0o644)
+
+
+def append_jsonl(path: str, record: dict) -> None:
+    """Append one record to a JSONL file through an O_APPEND fd.
+
+    The line is normally written by one unbuffered write(), so concurrent
+    writers cannot interleave it and readers of the file (the next trade,
+    the agent's position summary) see the record as soon as this returns.
+    A short write is finished with further writes, and then the line is no
+    longer atomic. The descriptor is kept between calls but reopened once the
+    path no longer names the same file, so a deleted or rotated file is
+    recreated rather than written through a stale descriptor.
+    """
+    data = memoryview(orjson.dumps(record) + b"\n")
+    fd = _APPEND_FDS.get(path)
+    if fd is not None and not _names_file(path, fd):
+        os.close(fd)
+        fd = None
+    if fd is None:
+        fd = _APPEND_FDS[path] = _open_append(path)
+    while data:
+        data = data[os.write(fd, data) :]
+
+
+def _names_file(path: str, fd: int) -> bool:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return False
+    fst = os.fstat(fd)
+    return (st.st_dev, st.st_ino) == (fst.st_dev, fst.st_ino)
+
+
+@atexit.register
+def _close_append_fds() -> None:
+    for fd in _APPEND_FDS.values():
+        os.close(fd)
+    _APPEND_FDS.clear()
+
+
 def extract_conversation(conversation: dict, output_type: str):
     """Extract information from a conversation payload.
 
@@ -3,7 +3,7 @@ ICT Prompt Generator for the AI-Trader Agent
 """
 import os
 import sys
-from datetime import datetime, timedelta
+from datetime import date, timedelta
 
 import toon
 
@@ -154,9 +154,9 @@ class IctPromptGenerator:
     def generate_prompt(self, today_date: str, signature: str) -> str:
         print(f"Generating ICT prompt for {signature} on {today_date} (Asset: {self.asset_type}, Model: {self.model_type})")
 
-        today = datetime.strptime(today_date, "%Y-%m-%d")
+        today = date.fromisoformat(today_date)
         yesterday = today - timedelta(days=1)
-        yesterday_date = yesterday.strftime("%Y-%m-%d")
+        yesterday_date = yesterday.isoformat()
 
         daily_prices_toon = self._get_prices_string_toon(daily=True)
         today_intraday_toon = self._get_prices_string_toon(target_date=today_date)
@@ -4,17 +4,24 @@ from dotenv import load_dotenv
 
 load_dotenv()
 import csv
+import functools
 import json
+import re
 import sys
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import orjson
 
 # 将项目根目录加入 Python 路径，便于从子目录直接运行本文件
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
-from tools.general_tools import get_config_value
+from tools.general_tools import append_jsonl, get_config_value
+
+# 只匹配 merged.jsonl 行中的标的代码，无需解析整行 JSON
+MERGED_SYMBOL_PATTERN = re.compile(rb'"2\. Symbol":\s*("(?:[^"\\]|\\.)*")')
 
 all_nasdaq_100_symbols = [
     "NQ1!",
@@ -132,14 +139,14 @@ def get_yesterday_date(today_date: str) -> str:
         yesterday_date: 昨日日期字符串，格式 YYYY-MM-DD。
     """
     # 计算昨日日期，考虑休市日
-    today_dt = datetime.strptime(today_date, "%Y-%m-%d")
+    today_dt = date.fromisoformat(today_date)
     yesterday_dt = today_dt - timedelta(days=1)
 
     # 如果昨日是周末，向前找到最近的交易日
     while yesterday_dt.weekday() >= 5:  # 5=Saturday, 6=Sunday
         yesterday_dt -= timedelta(days=1)
 
-    yesterday_date = yesterday_dt.strftime("%Y-%m-%d")
+    yesterday_date = yesterday_dt.isoformat()
     return yesterday_date
 
 
@@ -153,7 +160,7 @@ def get_nq_price_from_csv(date_str: str) -> Tuple[Optional[float], Optional[floa
     if not csv_path.exists():
         return None, None
 
-    target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+    target_date = date.fromisoformat(date_str)
 
     first_row = None
     last_row = None
@@ -225,6 +232,28 @@ def load_stock_intraday_data(symbol: str, data_dir: str = "data") -> Dict:
     return ohlcv_data
 
 
+def _iter_merged_docs(merged_file: Path, wanted: set) -> Iterator[Tuple[str, dict]]:
+    """逐行扫描 merged.jsonl，仅对目标标的的行做完整 JSON 解析。
+
+    先用正则在原始字节中取出标的代码，不在 wanted 中的行直接跳过。
+    """
+    with merged_file.open("rb") as f:
+        for line in f:
+            match = MERGED_SYMBOL_PATTERN.search(line)
+            if match is None:
+                continue
+            try:
+                if orjson.loads(match.group(1)) not in wanted:
+                    continue
+                doc = orjson.loads(line)
+            except Exception:
+                continue
+            meta = doc.get("Meta Data", {}) if isinstance(doc, dict) else {}
+            sym = meta.get("2. Symbol")
+            if sym in wanted:
+                yield sym, doc
+
+
 def get_open_prices(
     today_date: str, symbols: List[str], merged_path: Optional[str] = None
 ) -> Dict[str, Optional[float]]:
@@ -258,30 +287,19 @@ def get_open_prices(
     if not merged_file.exists():
         return results
 
-    with merged_file.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
+    for sym, doc in _iter_merged_docs(merged_file, wanted):
+        series = doc.get("Time Series (Daily)", {})
+        if not isinstance(series, dict):
+            continue
+        bar = series.get(today_date)
+        if isinstance(bar, dict):
+            open_val = bar.get("1. buy price")
             try:
-                doc = json.loads(line)
+                results[f"{sym}_price"] = (
+                    float(open_val) if open_val is not None else None
+                )
             except Exception:
-                continue
-            meta = doc.get("Meta Data", {}) if isinstance(doc, dict) else {}
-            sym = meta.get("2. Symbol")
-            if sym not in wanted:
-                continue
-            series = doc.get("Time Series (Daily)", {})
-            if not isinstance(series, dict):
-                continue
-            bar = series.get(today_date)
-            if isinstance(bar, dict):
-                open_val = bar.get("1. buy price")
-                try:
-                    results[f"{sym}_price"] = (
-                        float(open_val) if open_val is not None else None
-                    )
-                except Exception:
-                    results[f"{sym}_price"] = None
+                results[f"{sym}_price"] = None
 
     return results
 
@@ -322,71 +340,58 @@ def get_yesterday_open_and_close_price(
     if not merged_file.exists():
         return buy_results, sell_results
 
-    with merged_file.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
+    for sym, doc in _iter_merged_docs(merged_file, wanted):
+        series = doc.get("Time Series (Daily)", {})
+        if not isinstance(series, dict):
+            continue
+
+        # 尝试获取昨日买入价和卖出价
+        bar = series.get(yesterday_date)
+        if isinstance(bar, dict):
+            buy_val = bar.get("1. buy price")  # 买入价字段
+            sell_val = bar.get("4. sell price")  # 卖出价字段
+
             try:
-                doc = json.loads(line)
+                buy_price = float(buy_val) if buy_val is not None else None
+                sell_price = float(sell_val) if sell_val is not None else None
+                buy_results[f"{sym}_price"] = buy_price
+                sell_results[f"{sym}_price"] = sell_price
             except Exception:
-                continue
-            meta = doc.get("Meta Data", {}) if isinstance(doc, dict) else {}
-            sym = meta.get("2. Symbol")
-            if sym not in wanted:
-                continue
-            series = doc.get("Time Series (Daily)", {})
-            if not isinstance(series, dict):
-                continue
-
-            # 尝试获取昨日买入价和卖出价
-            bar = series.get(yesterday_date)
-            if isinstance(bar, dict):
-                buy_val = bar.get("1. buy price")  # 买入价字段
-                sell_val = bar.get("4. sell price")  # 卖出价字段
-
-                try:
-                    buy_price = float(buy_val) if buy_val is not None else None
-                    sell_price = float(sell_val) if sell_val is not None else None
-                    buy_results[f"{sym}_price"] = buy_price
-                    sell_results[f"{sym}_price"] = sell_price
-                except Exception:
-                    buy_results[f"{sym}_price"] = None
-                    sell_results[f"{sym}_price"] = None
-            else:
-                # 如果昨日没有数据，尝试向前查找最近的交易日
-                today_dt = datetime.strptime(today_date, "%Y-%m-%d")
-                yesterday_dt = today_dt - timedelta(days=1)
-                current_date = yesterday_dt
-                found_data = False
-
-                # 最多向前查找5个交易日
-                for _ in range(5):
+                buy_results[f"{sym}_price"] = None
+                sell_results[f"{sym}_price"] = None
+        else:
+            # 如果昨日没有数据，尝试向前查找最近的交易日
+            today_dt = date.fromisoformat(today_date)
+            yesterday_dt = today_dt - timedelta(days=1)
+            current_date = yesterday_dt
+            found_data = False
+
+            # 最多向前查找5个交易日
+            for _ in range(5):
+                current_date -= timedelta(days=1)
+                # 跳过周末
+                while current_date.weekday() >= 5:
                     current_date -= timedelta(days=1)
-                    # 跳过周末
-                    while current_date.weekday() >= 5:
-                        current_date -= timedelta(days=1)
-
-                    check_date = current_date.strftime("%Y-%m-%d")
-                    bar = series.get(check_date)
-                    if isinstance(bar, dict):
-                        buy_val = bar.get("1. buy price")
-                        sell_val = bar.get("4. sell price")
-
-                        try:
-                            buy_price = float(buy_val) if buy_val is not None else None
-                            sell_price = (
-                                float(sell_val) if sell_val is not None else None
-                            )
-                            buy_results[f"{sym}_price"] = buy_price
-                            sell_results[f"{sym}_price"] = sell_price
-                            found_data = True
-                            break
-                        except Exception:
-                            continue
-
-                if not found_data:
-                    buy_results[f"{sym}_price"] = None
-                    sell_results[f"{sym}_price"] = None
+
+                check_date = current_date.isoformat()
+                bar = series.get(check_date)
+                if isinstance(bar, dict):
+                    buy_val = bar.get("1. buy price")
+                    sell_val = bar.get("4. sell price")
+
+                    try:
+                        buy_price = float(buy_val) if buy_val is not None else None
+                        sell_price = float(sell_val) if sell_val is not None else None
+                        buy_results[f"{sym}_price"] = buy_price
+                        sell_results[f"{sym}_price"] = sell_price
+                        found_data = True
+                        break
+                    except Exception:
+                        continue
+
+            if not found_data:
+                buy_results[f"{sym}_price"] = None
+                sell_results[f"{sym}_price"] = None
 
     return buy_results, sell_results
 
@@ -456,12 +461,12 @@ def get_today_init_position(today_date: str, modelname: str) -> Dict[str, float]
     max_id = -1
     latest_positions = {}
 
-    with position_file.open("r", encoding="utf-8") as f:
+    with position_file.open("rb") as f:
         for line in f:
             if not line.strip():
                 continue
             try:
-                doc = json.loads(line)
+                doc = orjson.loads(line)
                 if doc.get("date") == yesterday_date:
                     current_id = doc.get("id", 0)
                     if current_id > max_id:
@@ -488,6 +493,7 @@ def get_latest_position(
     Returns:
         (positions, max_id):
           - positions: {symbol: weight} 的字典；若未找到任何记录，则为空字典。
+            每次调用返回新字典，调用方可直接修改。
           - max_id: 选中记录的最大 id；若未找到任何记录，则为 -1.
     """
     base_dir = Path(__file__).resolve().parents[1]
@@ -498,16 +504,30 @@ def get_latest_position(
     if not position_file.exists():
         return {"CASH": 10000.0}, -1
 
+    # 以 mtime/size 作为缓存键：文件追加新记录后缓存自动失效
+    stat = position_file.stat()
+    positions, max_id = _read_latest_position(
+        str(position_file), today_date, stat.st_mtime_ns, stat.st_size
+    )
+    return dict(positions), max_id
+
+
+@functools.lru_cache(maxsize=32)
+def _read_latest_position(
+    path: str, today_date: str, mtime_ns: int, size: int
+) -> Tuple[Dict[str, float], int]:
+    position_file = Path(path)
+
     # 先尝试读取当天记录
     max_id_today = -1
     latest_positions_today: Dict[str, float] = {}
 
-    with position_file.open("r", encoding="utf-8") as f:
+    with position_file.open("rb") as f:
         for line in f:
             if not line.strip():
                 continue
             try:
-                doc = json.loads(line)
+                doc = orjson.loads(line)
                 if doc.get("date") == today_date:
                     current_id = doc.get("id", -1)
                     if current_id > max_id_today:
@@ -524,12 +544,12 @@ def get_latest_position(
     max_id_prev = -1
     latest_positions_prev: Dict[str, float] = {}
 
-    with position_file.open("r", encoding="utf-8") as f:
+    with position_file.open("rb") as f:
         for line in f:
             if not line.strip():
                 continue
             try:
-                doc = json.loads(line)
+                doc = orjson.loads(line)
                 if doc.get("date") == prev_date:
                     current_id = doc.get("id", -1)
                     if current_id > max_id_prev:
@@ -566,8 +586,7 @@ def add_no_trade_record(today_date: str, modelname: str):
         base_dir / "data" / "agent_data" / modelname / "position" / "position.jsonl"
     )
 
-    with position_file.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(save_item) + "\n")
+    append_jsonl(str(position_file), save_item)
     return
 
 
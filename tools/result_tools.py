@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 import numpy as np
+import orjson
 import pandas as pd
 
 from tools.general_tools import get_config_value
@@ -51,6 +52,41 @@ def calculate_portfolio_value(
     return total_value
 
 
+def load_position_frame(position_file: Path) -> pd.DataFrame:
+    """
+    Load the latest position of each date as a columnar frame
+
+    Args:
+        position_file: Path to a position.jsonl ledger
+
+    Returns:
+        Date-indexed DataFrame (sorted) with one float column per symbol,
+        CASH included; symbols absent on a date are 0.0
+    """
+    latest: Dict[str, Tuple[int, Dict[str, float]]] = {}
+    with position_file.open("rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                doc = orjson.loads(line)
+            except Exception:
+                continue
+            date = doc.get("date")
+            if not date:
+                continue
+            record_id = doc.get("id", 0)
+            if date not in latest or record_id > latest[date][0]:
+                latest[date] = (record_id, doc.get("positions", {}))
+
+    frame = pd.DataFrame.from_dict(
+        {date: positions for date, (_, positions) in latest.items()},
+        orient="index",
+        dtype=float,
+    )
+    return frame.sort_index().fillna(0.0)
+
+
 def get_available_date_range(modelname: str) -> Tuple[str, str]:
     """
     Get available data date range
@@ -69,25 +105,23 @@ def get_available_date_range(modelname: str) -> Tuple[str, str]:
     if not position_file.exists():
         return "", ""
 
-    dates = []
+    earliest = latest = ""
 
-    with position_file.open("r", encoding="utf-8") as f:
+    with position_file.open("rb") as f:
         for line in f:
             if not line.strip():
                 continue
             try:
-                doc = json.loads(line)
-                date = doc.get("date")
-                if date:
-                    dates.append(date)
+                date = orjson.loads(line).get("date")
             except Exception:
                 continue
+            if date:
+                if not earliest or date < earliest:
+                    earliest = date
+                if date > latest:
+                    latest = date
 
-    if not dates:
-        return "", ""
-
-    dates.sort()
-    return dates[0], dates[-1]
+    return earliest, latest
 
 
 def get_daily_portfolio_values(
@@ -124,17 +158,13 @@ def get_daily_portfolio_values(
         if end_date is None:
             end_date = latest_date
 
-    # Read position data
-    position_data = []
-    with position_file.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            try:
-                doc = json.loads(line)
-                position_data.append(doc)
-            except Exception:
-                continue
+    # Read position data: latest record per date, one column per symbol
+    positions = load_position_frame(position_file)
+    if positions.empty:
+        return {}
+    positions = positions[
+        (positions.index >= start_date) & (positions.index <= end_date)
+    ]
 
     # Read price data
     price_data = {}
@@ -151,46 +181,26 @@ def get_daily_portfolio_values(
             except Exception:
                 continue
 
-    # Calculate daily portfolio values
-    daily_values = {}
-
-    # Group position data by date
-    positions_by_date = {}
-    for record in position_data:
-        date = record.get("date")
-        if date:
-            if date not in positions_by_date:
-                positions_by_date[date] = []
-            positions_by_date[date].append(record)
-
-    # For each date, sort records by id and take latest position
-    for date, records in positions_by_date.items():
-        if start_date and date < start_date:
-            continue
-        if end_date and date > end_date:
-            continue
-
-        # Sort by id and take latest position
-        latest_record = max(records, key=lambda x: x.get("id", 0))
-        positions = latest_record.get("positions", {})
-
-        # Get daily prices
-        daily_prices = {}
-        for symbol in all_nasdaq_100_symbols:
-            if symbol in price_data:
-                symbol_prices = price_data[symbol]
-                if date in symbol_prices:
-                    price_info = symbol_prices[date]
-                    buy_price = price_info.get("1. buy price")
-                    sell_price = price_info.get("4. sell price")
-                    # Use closing (sell) price to calculate value
-                    if sell_price is not None:
-                        daily_prices[f"{symbol}_price"] = float(sell_price)
-
-        # Calculate portfolio value
-        cash = positions.get("CASH", 0.0)
-        portfolio_value = calculate_portfolio_value(positions, daily_prices, cash)
-        daily_values[date] = portfolio_value
+    # Closing (sell) prices aligned with the position frame; NaN where unavailable
+    symbols = [
+        symbol
+        for symbol in dict.fromkeys(all_nasdaq_100_symbols)
+        if symbol in price_data and symbol in positions.columns
+    ]
+    prices = np.full((len(positions.index), len(symbols)), np.nan)
+    for col, symbol in enumerate(symbols):
+        symbol_prices = price_data[symbol]
+        for row, date in enumerate(positions.index):
+            sell_price = symbol_prices.get(date, {}).get("4. sell price")
+            if sell_price is not None:
+                prices[row, col] = float(sell_price)
+
+    # Value long holdings with a known price, plus cash
+    shares = positions[symbols].to_numpy()
+    held = (shares > 0) & ~np.isnan(prices)
+    holdings_value = np.where(held, shares * np.nan_to_num(prices), 0.0).sum(axis=1)
+    cash = positions["CASH"].to_numpy() if "CASH" in positions.columns else 0.0
+    daily_values = dict(zip(positions.index, (cash + holdings_value).tolist()))
 
     return daily_values
 